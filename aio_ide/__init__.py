@@ -0,0 +1,57 @@
+# aio_ide: genera proyectos (web, .NET, Rust, Go, SQL, Lua...) a partir de archivos .aio.
+# Los nombres públicos se cargan al usarlos por primera vez, así que `import aio_ide`
+# no ejecuta nada ni importa dependencias pesadas.
+import importlib
+
+# nombre público -> submódulo que lo define
+_EXPORTS = {
+    'parse': 'api',
+    'plan': 'api',
+    'emit': 'api',
+    'AIO_BLOCK_TAGS': 'lexer',
+    'AioBlock': 'lexer',
+    'AioTagProblem': 'lexer',
+    'MappedBlock': 'lexer',
+    'iter_aio_blocks': 'lexer',
+    'iter_aio_file_blocks': 'lexer',
+    'scan_aio_blocks': 'lexer',
+    'parse_aio_content': 'parser',
+    'parse_aio_file': 'parser',
+    'parse_meta_block': 'parser',
+    'ParseCache': 'parse_cache',
+    'ParsedBlocks': 'lexer',
+    'esp_pin_states': 'crea',
+    'parse_crea_block': 'crea',
+    'compile_crea_block': 'crea',
+    'execute_crea_plan': 'crea',
+    'CsprojInfo': 'csproj',
+    'iter_csproj_projects': 'csproj',
+    'FILE_MAP_GENERATORS': 'planner',
+    'plan_file_map': 'planner',
+    'AIO_SPLIT_LANGUAGES': 'planner',
+    'SplitLanguage': 'planner',
+    'emit_files': 'backends',
+    'DirectoryBackend': 'backends',
+    'MemoryBackend': 'backends',
+    'ArchiveBackend': 'backends',
+    'save_blocks_to_files': 'emitter',
+    'find_aio_files': 'runner',
+    'discover_aio_files': 'discovery',
+    'process_aio_file': 'runner',
+    'process_aio_files': 'runner',
+    'watch_aio_files': 'watch',
+    'main': 'cli',
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,6 @@
+# Permite ejecutar `python -m aio_ide`
+import sys
+
+from .cli import main
+
+sys.exit(main())
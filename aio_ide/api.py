@@ -0,0 +1,19 @@
+# API de alto nivel para usar aio_ide como biblioteca: parse -> plan -> emit
+from .parser import parse_aio_file
+from .planner import plan_file_map, flatten_plan
+from .emitter import save_blocks_to_files
+
+# Parsea un archivo .aio; devuelve (blocks, config) o (None, {}) si no se pudo leer.
+# Con cache=ParseCache(...) se reutiliza el parseo guardado si el archivo no cambió
+# (llamar a cache.flush() después de plan/emit para guardar las entradas nuevas).
+def parse(file_path, stream=False, cache=None):
+    return parse_aio_file(file_path, stream=stream, cache=cache)
+
+# Lista de salidas (file_map) que generan los bloques de un .aio, sin tocar el disco
+def plan(blocks, base_name):
+    return flatten_plan(plan_file_map(blocks, base_name))
+
+# Escribe las salidas de un .aio en su output_dir; acepta las opciones de save_blocks_to_files
+# (force, emit_workers, fsync, file_map, dry_run, backend, link_identical) y devuelve los contadores de la ejecución
+def emit(blocks, config, base_name, **save_options):
+    return save_blocks_to_files(blocks, config, base_name, **save_options)
@@ -0,0 +1,523 @@
+# Backends de salida: dónde escriben save_blocks_to_files y los comandos <crea>.
+#   DirectoryBackend -> árbol de directorios real (por defecto)
+#   MemoryBackend    -> sistema de archivos virtual en memoria (biblioteca, pruebas, previsualización)
+#   ArchiveBackend   -> un .zip o .tar(.gz/.bz2/.xz) que se escribe en streaming al cerrar el backend
+# Todas las rutas que reciben los backends son las mismas que usa el emisor (output_dir/...).
+import os
+import stat
+import time
+import shutil
+import threading
+
+from .lexer import MappedBlock, write_block_content
+from .report import phase, count
+
+# Políticas de fsync de la etapa de emisión:
+#   'none'  -> no se fuerza nada a disco (más rápido)
+#   'file'  -> fsync de cada archivo antes de reemplazar el original
+#   'batch' -> fsync de todos los archivos escritos al final de la etapa
+AIO_FSYNC_POLICIES = ('none', 'file', 'batch')
+DEFAULT_EMIT_WORKERS = 8
+# A partir de cuántos archivos se reparte un borrado en bloque entre varios hilos
+PARALLEL_REMOVE_MIN = 64
+
+# Escribe un archivo de forma atómica: temporal en el mismo directorio + os.replace
+def write_file_atomic(full_path, prefix, content, suffix, fsync_file=False):
+    directory, name = os.path.split(full_path)
+    temp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(prefix)
+            write_block_content(f, content)
+            f.write(suffix)
+            if fsync_file:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, full_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+# fsync de un archivo o directorio ya escrito (los directorios no se pueden abrir en Windows)
+def fsync_path(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+# Directorios que hay que crear de verdad: los más profundos, os.makedirs crea los padres de paso
+def deepest_dirs(directories):
+    ancestors = set()
+    for directory in directories:
+        directory = os.path.dirname(directory)
+        while directory and directory not in ancestors:
+            ancestors.add(directory)
+            directory = os.path.dirname(directory)
+    return sorted(set(directories) - ancestors)
+
+# Etapa de emisión: crea cada directorio padre una sola vez y escribe los archivos
+# de forma atómica en un pool de hilos acotado. `files` es una lista de
+# (full_path, prefijo, contenido, sufijo); devuelve la excepción (o None) de cada archivo, en orden.
+def emit_files(files, workers=DEFAULT_EMIT_WORKERS, fsync='none'):
+    if fsync not in AIO_FSYNC_POLICIES:
+        raise ValueError(f"Política de fsync desconocida: '{fsync}' (use {', '.join(AIO_FSYNC_POLICIES)})")
+    if not files:
+        return []
+
+    # Solo hace falta crear los directorios más profundos: os.makedirs crea los padres de paso
+    with phase('emit.makedirs'):
+        for directory in deepest_dirs({os.path.dirname(full_path) for full_path, _, _, _ in files}):
+            if directory:
+                count('makedirs')
+                try:
+                    os.makedirs(directory, exist_ok=True)
+                except OSError as e:
+                    print(f"Error al crear el directorio '{directory}': {e}")
+
+    def write_one(file_entry):
+        full_path, prefix, content, suffix = file_entry
+        try:
+            write_file_atomic(full_path, prefix, content, suffix, fsync_file=(fsync == 'file'))
+        except Exception as e:
+            return e
+        return None
+
+    with phase('emit.write'):
+        if workers <= 1 or len(files) == 1:
+            errors = [write_one(file_entry) for file_entry in files]
+        else:
+            import concurrent.futures
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(workers, len(files))) as executor:
+                errors = list(executor.map(write_one, files))
+
+    if fsync != 'none':
+        count('fsync', len(files))
+        written_paths = [file_entry[0] for file_entry, error in zip(files, errors) if error is None]
+        if fsync == 'batch':
+            for full_path in written_paths:
+                fsync_path(full_path)
+        # Las entradas de directorio (renombrados) se sincronizan una vez por directorio
+        for directory in {os.path.dirname(full_path) for full_path in written_paths}:
+            fsync_path(directory or '.')
+    return errors
+
+# Bytes UTF-8 del contenido final de un archivo (prefijo + bloque sin espacios en los extremos + sufijo), por trozos
+def iter_file_bytes(prefix, content, suffix):
+    if prefix:
+        yield prefix.encode('utf-8')
+    if isinstance(content, MappedBlock):
+        yield from content.iter_chunks()
+    else:
+        yield content.strip().encode('utf-8')
+    if suffix:
+        yield suffix.encode('utf-8')
+
+# Interfaz común de los backends. Las rutas se normalizan con normalize(); kind() devuelve
+# 'file', 'dir' o None (un enlace simbólico es 'file': no se sigue) y stat() (tamaño, mtime_ns) o None.
+# `incremental` indica si el backend conserva un manifiesto entre ejecuciones y `supports_links`
+# si puede crear enlaces duros (link_file).
+class OutputBackend:
+    incremental = True
+    supports_links = False
+
+    def normalize(self, path):
+        return os.path.abspath(path)
+
+    def kind(self, path):
+        raise NotImplementedError
+
+    def stat(self, path):
+        raise NotImplementedError
+
+    def makedirs(self, path):
+        raise NotImplementedError
+
+    # files: lista de (full_path, prefijo, contenido, sufijo); devuelve la excepción (o None) de cada archivo
+    def write_files(self, files, workers=DEFAULT_EMIT_WORKERS, fsync='none'):
+        raise NotImplementedError
+
+    def write_text(self, path, text):
+        raise NotImplementedError
+
+    # Contenido de un archivo (None si no existe) y escritura atómica de uno completo (manifiesto)
+    def read_bytes(self, path):
+        raise NotImplementedError
+
+    def write_bytes(self, path, data):
+        raise NotImplementedError
+
+    def remove(self, path):
+        raise NotImplementedError
+
+    # Crea `path` como enlace duro a `source` (solo si supports_links)
+    def link_file(self, source, path):
+        raise NotImplementedError
+
+    def remove_tree(self, path):
+        raise NotImplementedError
+
+    # Borra una lista de archivos; devuelve, por archivo, None o la excepción OSError
+    def remove_files(self, paths, workers=1):
+        errors = []
+        for path in paths:
+            try:
+                self.remove(path)
+            except OSError as e:
+                errors.append(e)
+            else:
+                errors.append(None)
+        return errors
+
+    # Borra un directorio solo si está vacío; devuelve True si lo borró
+    def remove_empty_dir(self, path):
+        raise NotImplementedError
+
+    # Índice {ruta normalizada: 'file'/'dir'} de `root` y todo lo que cuelga de él, en un solo recorrido.
+    # Con follow_root=True un `root` que es enlace simbólico a un directorio se recorre como tal.
+    def scan(self, root, follow_root=False):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+# Árbol de directorios real: escritura atómica en un pool de hilos (ver emit_files)
+class DirectoryBackend(OutputBackend):
+    supports_links = True
+
+    def kind(self, path):
+        count('exists')
+        try:
+            mode = os.lstat(path).st_mode
+        except OSError:
+            return None
+        return 'dir' if stat.S_ISDIR(mode) else 'file'
+
+    def stat(self, path):
+        count('stat')
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            return None
+        return file_stat.st_size, file_stat.st_mtime_ns
+
+    def makedirs(self, path):
+        count('makedirs')
+        os.makedirs(path, exist_ok=True)
+
+    def write_files(self, files, workers=DEFAULT_EMIT_WORKERS, fsync='none'):
+        return emit_files(files, workers=workers, fsync=fsync)
+
+    # Atómica como las salidas: si `path` es un enlace duro (--link-identical), os.replace rompe el
+    # enlace en lugar de escribir a través de él en el archivo de otro proyecto
+    def write_text(self, path, text):
+        write_file_atomic(path, text, '', '')
+
+    def read_bytes(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write_bytes(self, path, data):
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def remove(self, path):
+        count('remove')
+        os.remove(path)
+
+    # Enlace duro atómico: temporal en el mismo directorio + os.replace (como write_file_atomic)
+    def link_file(self, source, path):
+        directory, name = os.path.split(path)
+        os.makedirs(directory or '.', exist_ok=True)
+        temp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.link")
+        os.link(source, temp_path)
+        try:
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def remove_tree(self, path):
+        count('remove')
+        shutil.rmtree(path)
+
+    # Los borrados grandes se reparten entre `workers` hilos (os.remove libera el GIL)
+    def remove_files(self, paths, workers=1):
+        def remove_one(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                return e
+            return None
+
+        count('remove', len(paths))
+        if workers <= 1 or len(paths) < PARALLEL_REMOVE_MIN:
+            return [remove_one(path) for path in paths]
+        from concurrent.futures import ThreadPoolExecutor # Solo para borrados en bloque grandes
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(remove_one, paths))
+
+    def remove_empty_dir(self, path):
+        try:
+            os.rmdir(path)
+        except OSError:
+            return False
+        return True
+
+    def scan(self, root, follow_root=False):
+        root = self.normalize(root)
+        entries = {}
+        kind = 'dir' if follow_root and os.path.isdir(root) else self.kind(root)
+        if kind is None:
+            return entries
+        entries[root] = kind
+        # Recorrido explícito con os.scandir: el tipo sale de la propia entrada del directorio,
+        # sin un stat por ruta. Los enlaces simbólicos cuentan como archivos (no se siguen).
+        pending = [root] if kind == 'dir' else []
+        while pending:
+            directory = pending.pop()
+            count('scandir')
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            entries[entry.path] = 'dir'
+                            pending.append(entry.path)
+                        else:
+                            entries[entry.path] = 'file'
+            except OSError:
+                continue
+        return entries
+
+# Sistema de archivos virtual: {ruta normalizada: (tipo, datos, mtime_ns)}. Los padres se crean
+# implícitamente (como haría os.makedirs) hasta el directorio de trabajo al crear el backend, que
+# es la raíz del resultado. Base de MemoryBackend y ArchiveBackend.
+class _VirtualBackend(OutputBackend):
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.base_dir = os.path.abspath('.')
+
+    def _add_parents(self, key):
+        parent = os.path.dirname(key)
+        while parent not in self.entries and parent != self.base_dir and parent != os.path.dirname(parent):
+            self.entries[parent] = ('dir', None, time.time_ns())
+            parent = os.path.dirname(parent)
+
+    def _store(self, key, prefix, content, suffix):
+        raise NotImplementedError
+
+    def _size(self, entry):
+        raise NotImplementedError
+
+    def kind(self, path):
+        entry = self.entries.get(self.normalize(path))
+        return entry[0] if entry else None
+
+    def stat(self, path):
+        entry = self.entries.get(self.normalize(path))
+        if entry is None:
+            return None
+        return self._size(entry), entry[2]
+
+    def makedirs(self, path):
+        key = self.normalize(path)
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = ('dir', None, time.time_ns())
+                self._add_parents(key)
+
+    def write_files(self, files, workers=DEFAULT_EMIT_WORKERS, fsync='none'):
+        if fsync not in AIO_FSYNC_POLICIES:
+            raise ValueError(f"Política de fsync desconocida: '{fsync}' (use {', '.join(AIO_FSYNC_POLICIES)})")
+        errors = []
+        with phase('emit.write'):
+            for full_path, prefix, content, suffix in files:
+                key = self.normalize(full_path)
+                if self.kind(key) == 'dir':
+                    errors.append(IsADirectoryError(f"'{full_path}' es un directorio"))
+                    continue
+                with self.lock:
+                    self._add_parents(key)
+                    self._store(key, prefix, content, suffix)
+                errors.append(None)
+        return errors
+
+    def write_text(self, path, text):
+        key = self.normalize(path)
+        if self.kind(key) == 'dir':
+            raise IsADirectoryError(f"'{path}' es un directorio")
+        with self.lock:
+            self._add_parents(key)
+            self._store(key, text, '', '')
+
+    def read_bytes(self, path):
+        entry = self.entries.get(self.normalize(path))
+        if entry is None or entry[0] != 'file':
+            return None
+        return self._bytes(entry)
+
+    def write_bytes(self, path, data):
+        key = self.normalize(path)
+        with self.lock:
+            self._add_parents(key)
+            self.entries[key] = ('file', data, time.time_ns())
+
+    def _bytes(self, entry):
+        data = entry[1]
+        return data if isinstance(data, bytes) else b''.join(iter_file_bytes(*data))
+
+    def remove(self, path):
+        key = self.normalize(path)
+        if self.kind(key) != 'file':
+            raise FileNotFoundError(f"'{path}' no es un archivo")
+        del self.entries[key]
+
+    def remove_tree(self, path):
+        key = self.normalize(path)
+        prefix = key.rstrip(os.sep) + os.sep
+        with self.lock:
+            self.entries.pop(key, None)
+            for entry in [entry for entry in self.entries if entry.startswith(prefix)]:
+                del self.entries[entry]
+
+    def remove_empty_dir(self, path):
+        key = self.normalize(path)
+        prefix = key.rstrip(os.sep) + os.sep
+        if self.kind(key) != 'dir' or any(entry.startswith(prefix) for entry in self.entries):
+            return False
+        del self.entries[key]
+        return True
+
+    def scan(self, root, follow_root=False):
+        key = self.normalize(root)
+        prefix = key.rstrip(os.sep) + os.sep
+        return {entry: value[0] for entry, value in self.entries.items() if entry == key or entry.startswith(prefix)}
+
+    # Ruta relativa (con '/') de una entrada respecto al directorio de trabajo al crear el backend
+    def relative_name(self, key):
+        name = os.path.relpath(key, self.base_dir)
+        if name == os.pardir or name.startswith(os.pardir + os.sep):
+            name = os.path.splitdrive(key)[1].lstrip(os.sep)
+        return name.replace(os.sep, '/')
+
+# Sistema de archivos en memoria: los archivos se guardan como bytes al escribirlos.
+# `files` y `directories` exponen el resultado con rutas relativas al directorio de trabajo;
+# el manifiesto (.aio_manifest.json) se guarda para las ejecuciones incrementales pero no sale en `files`.
+class MemoryBackend(_VirtualBackend):
+    def _store(self, key, prefix, content, suffix):
+        data = b''.join(iter_file_bytes(prefix, content, suffix))
+        self.entries[key] = ('file', data, time.time_ns())
+
+    def _size(self, entry):
+        return len(entry[1]) if entry[0] == 'file' else 0
+
+    @property
+    def files(self):
+        from .manifest import AIO_MANIFEST_NAME # manifest.py importa este módulo
+        return {self.relative_name(key): entry[1] for key, entry in sorted(self.entries.items())
+                if entry[0] == 'file' and os.path.basename(key) != AIO_MANIFEST_NAME}
+
+    @property
+    def directories(self):
+        return [self.relative_name(key) for key, entry in sorted(self.entries.items()) if entry[0] == 'dir']
+
+# Archivo .zip o .tar(.gz/.bz2/.xz). Las entradas se registran como referencias a su contenido
+# (sin copiarlo) para que %borra y las sobrescrituras se apliquen antes de escribir; close()
+# escribe el archivo de una pasada, entrada a entrada, y lo coloca de forma atómica.
+# No es incremental: cada ejecución genera el archivo completo.
+class ArchiveBackend(_VirtualBackend):
+    incremental = False
+
+    _TAR_MODES = (('.tar.gz', 'w:gz'), ('.tgz', 'w:gz'), ('.tar.bz2', 'w:bz2'), ('.tar.xz', 'w:xz'), ('.tar', 'w'))
+
+    def __init__(self, archive_path):
+        super().__init__()
+        self.archive_path = archive_path
+        lower_path = archive_path.lower()
+        self.tar_mode = next((mode for suffix, mode in self._TAR_MODES if lower_path.endswith(suffix)), None)
+        if self.tar_mode is None and not lower_path.endswith('.zip'):
+            raise ValueError(f"Formato de archivo no soportado: '{archive_path}' (use .zip, .tar, .tar.gz, .tar.bz2 o .tar.xz)")
+
+    def _store(self, key, prefix, content, suffix):
+        self.entries[key] = ('file', (prefix, content, suffix), time.time_ns())
+
+    def _size(self, entry):
+        if entry[0] != 'file':
+            return 0
+        if isinstance(entry[1], bytes):
+            return len(entry[1])
+        return sum(len(chunk) for chunk in iter_file_bytes(*entry[1]))
+
+    def _iter_entry_chunks(self, entry):
+        if isinstance(entry[1], bytes):
+            yield entry[1]
+        else:
+            yield from iter_file_bytes(*entry[1])
+
+    def close(self):
+        temp_path = f"{self.archive_path}.{os.getpid()}.tmp"
+        parent = os.path.dirname(self.archive_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        try:
+            with phase('emit.archive'):
+                if self.tar_mode is None:
+                    self._write_zip(temp_path)
+                else:
+                    self._write_tar(temp_path)
+            os.replace(temp_path, self.archive_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def _write_zip(self, temp_path):
+        import zipfile
+        with zipfile.ZipFile(temp_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for key, entry in sorted(self.entries.items()):
+                name = self.relative_name(key)
+                date_time = time.localtime(entry[2] / 1e9)[:6]
+                if entry[0] == 'dir':
+                    archive.writestr(zipfile.ZipInfo(name + '/', date_time=date_time), b'')
+                    continue
+                info = zipfile.ZipInfo(name, date_time=date_time)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with archive.open(info, 'w') as member:
+                    for chunk in self._iter_entry_chunks(entry):
+                        member.write(chunk)
+                count('bytes_written', info.file_size)
+
+    def _write_tar(self, temp_path):
+        import io
+        import tarfile
+        with tarfile.open(temp_path, self.tar_mode) as archive:
+            for key, entry in sorted(self.entries.items()):
+                info = tarfile.TarInfo(self.relative_name(key))
+                info.mtime = entry[2] // 1_000_000_000
+                if entry[0] == 'dir':
+                    info.type = tarfile.DIRTYPE
+                    info.mode = 0o755
+                    archive.addfile(info)
+                    continue
+                # tar necesita el tamaño antes del contenido: se materializa una entrada cada vez
+                data = b''.join(self._iter_entry_chunks(entry))
+                info.size = len(data)
+                info.mode = 0o644
+                archive.addfile(info, io.BytesIO(data))
+                count('bytes_written', info.size)
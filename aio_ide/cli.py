@@ -0,0 +1,137 @@
+# Línea de comandos de aio_ide. argparse y los módulos de generación se importan dentro de main()
+import os
+import sys
+
+
+def main(argv=None):
+    import argparse
+    from .emitter import AIO_FSYNC_POLICIES, DEFAULT_EMIT_WORKERS
+
+    arg_parser = argparse.ArgumentParser(prog='aio', description="Genera proyectos a partir de archivos .aio.")
+    arg_parser.add_argument('paths', nargs='*', default=['.'],
+                            help="Archivos .aio o directorios donde buscarlos (por defecto el directorio actual).")
+    arg_parser.add_argument('-r', '--recursive', action='store_true',
+                            help="Busca .aio también en los subdirectorios (respeta .aioignore y salta .git y las salidas).")
+    arg_parser.add_argument('-o', '--output-dir',
+                            help="Directorio de salida; sustituye al output_dir del bloque <meta>.")
+    arg_parser.add_argument('--stream', action='store_true',
+                            help="Mapea los .aio en memoria y copia los bloques directamente a los archivos de salida.")
+    arg_parser.add_argument('--force', action='store_true',
+                            help="Reescribe todas las salidas aunque el manifiesto indique que no cambiaron.")
+    arg_parser.add_argument('-j', '--jobs', type=int, default=1,
+                            help="Número de procesos para procesar varios .aio en paralelo (por defecto 1).")
+    arg_parser.add_argument('--emit-workers', type=int, default=DEFAULT_EMIT_WORKERS,
+                            help=f"Hilos para escribir los archivos generados (por defecto {DEFAULT_EMIT_WORKERS}).")
+    arg_parser.add_argument('--fsync', choices=AIO_FSYNC_POLICIES, default='none',
+                            help="Durabilidad de las escrituras: none, file (fsync por archivo) o batch (al final).")
+    arg_parser.add_argument('--link-identical', action='store_true',
+                            help="Crea como enlace duro las salidas idénticas a otra ya generada en la ejecución.")
+    arg_parser.add_argument('--archive',
+                            help="Escribe las salidas en un archivo .zip o .tar(.gz/.bz2/.xz) en lugar de en output_dir.")
+    arg_parser.add_argument('--dry-run', action='store_true',
+                            help="Muestra qué archivos se escribirían o borrarían y el plan de <crea>, sin tocar el disco.")
+    arg_parser.add_argument('--cache-dir', default='.aio_cache',
+                            help="Directorio de la caché de parseo persistente (por defecto .aio_cache).")
+    arg_parser.add_argument('--cache-max-mb', type=float, default=64,
+                            help="Tamaño máximo de la caché de parseo en MB; se borran las entradas menos usadas (por defecto 64).")
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help="No usa la caché de parseo: vuelve a parsear todos los .aio.")
+    arg_parser.add_argument('--watch', action='store_true',
+                            help="Se queda vigilando los .aio y regenera solo los bloques que cambian al guardar.")
+    arg_parser.add_argument('--interval', type=float, default=0.05,
+                            help="Segundos entre sondeos en modo --watch (por defecto 0.05).")
+    arg_parser.add_argument('-q', '--quiet', action='store_true',
+                            help="No imprime un mensaje por archivo; solo advertencias, errores y un resumen final.")
+    arg_parser.add_argument('--report-dir',
+                            help="Guarda un informe JSON por .aio (tiempos por fase, bytes, archivos, llamadas al sistema).")
+    arg_parser.add_argument('--profile', action='store_true',
+                            help="Ejecuta cada .aio bajo cProfile y guarda <nombre>.prof en --report-dir (por defecto aio_reports).")
+    args = arg_parser.parse_args(argv)
+    if args.watch and (args.dry_run or args.archive):
+        arg_parser.error("--dry-run y --archive no se pueden combinar con --watch")
+    save_options = {'force': args.force, 'emit_workers': args.emit_workers, 'fsync': args.fsync}
+    if args.dry_run:
+        save_options['dry_run'] = True
+    if args.link_identical:
+        save_options['link_identical'] = True
+    if args.archive:
+        from .backends import ArchiveBackend
+        try:
+            save_options['backend'] = ArchiveBackend(args.archive)
+        except ValueError as e:
+            arg_parser.error(str(e))
+        # Todos los .aio escriben en el mismo archivo: se procesan en este proceso
+        args.jobs = 1
+    if args.profile and not args.report_dir:
+        args.report_dir = 'aio_reports'
+
+    from .report import set_quiet, merge_reports, start_report, finish_report
+    set_quiet(args.quiet)
+
+    # --dry-run no toca el disco: tampoco lee ni actualiza .aio_cache/ (la lectura marca el uso para el LRU)
+    cache_dir = None if args.no_cache or args.dry_run else args.cache_dir
+    if args.watch:
+        from .watch import watch_aio_files
+        watch_aio_files(args.paths, interval=args.interval, output_dir=args.output_dir, recursive=args.recursive,
+                        cache_dir=cache_dir, **save_options)
+        return 0
+
+    from .runner import find_aio_files, process_aio_files
+
+    where = "el directorio actual" if args.paths == ['.'] else ', '.join(args.paths)
+    print(f"Buscando archivos .aio en {where}...")
+    fragments = []
+    aio_files = find_aio_files(args.paths, recursive=args.recursive, cache_dir=cache_dir, fragments=fragments)
+    if fragments:
+        print(f"Fragmentos incluidos por otros .aio (no se procesan por separado): {', '.join(fragments)}")
+
+    if not aio_files:
+        print(f"No se encontraron archivos .aio en {where}.")
+        return 0
+
+    totals = {'written': 0, 'skipped': 0, 'removed': 0}
+    failed = 0
+    reports = []
+    for aio_file, stats in process_aio_files(aio_files, jobs=args.jobs, stream=args.stream, output_dir=args.output_dir,
+                                             report_dir=args.report_dir, profile=args.profile,
+                                             cache_dir=cache_dir,
+                                             cache_max_bytes=int(args.cache_max_mb * 1024 * 1024), **save_options):
+        if stats is None:
+            failed += 1
+            continue
+        for counter in totals:
+            totals[counter] += stats[counter]
+        reports.append(stats['report'])
+
+    if args.archive and not args.dry_run:
+        # El archivo se escribe al cerrarlo, después de los informes por .aio: sus bytes van en uno propio
+        archive_report = start_report(args.archive)
+        try:
+            save_options['backend'].close()
+        finally:
+            finish_report()
+        reports.append(archive_report.to_dict())
+        print(f"\nArchivo '{args.archive}' generado ({os.path.getsize(args.archive)} bytes).")
+
+    print("\nProcesamiento de todos los archivos .aio completado.")
+    print(f"Total: {len(aio_files) - failed} archivos .aio procesados, {failed} con errores; "
+          f"{totals['written']} escritos, {totals['skipped']} sin cambios, {totals['removed']} eliminados.")
+
+    if args.quiet or args.report_dir:
+        merged = merge_reports(reports)
+        phases = ', '.join(f"{name} {entry['seconds'] * 1000:.1f} ms" for name, entry in merged['phases'].items()
+                           if '.' not in name)
+        counters = merged['counters']
+        print(f"Fases: {phases or '-'}; {counters.get('bytes_written', 0)} bytes escritos, "
+              f"{counters.get('makedirs', 0)} makedirs, {counters.get('exists', 0) + counters.get('stat', 0)} exists/stat.")
+        if args.report_dir:
+            import json
+            os.makedirs(args.report_dir, exist_ok=True)
+            with open(os.path.join(args.report_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+                json.dump(dict(merged, totals=totals, processed=len(aio_files) - failed, failed=failed), f, indent=2)
+            print(f"Informes guardados en '{args.report_dir}'.")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,444 @@
+# Comandos del bloque <crea>: $crea=file y %borra
+# Cada bloque se compila una vez a un plan de operaciones (cacheado por hash del bloque)
+# que luego se ejecuta contra un índice del directorio de salida construido con un solo recorrido.
+import re
+import os
+import fnmatch
+from collections import namedtuple
+
+from .backends import DirectoryBackend, deepest_dirs
+from .report import info, count, phase
+
+# Placeholder para los estados de los pines de (esp)
+esp_pin_states = {
+    "deploy_success": "no",
+    "n": "si",
+    "p": "no",
+}
+
+_CREA_FILE_RE = re.compile(r'\$crea=file\s+Name="([^"]+)"\s*(%extencion\s*\.([^,\s]+))?\s*(%Not_extencion)?(,)?')
+_BORRA_RE = re.compile(r'%borra=(?:Name="([^"]+)"|file="([^"]+)")(?:\s*(%all))?(?:\s*%patron="([^"]*)")?'
+                       r'(?:\s*%excepto="([^"]*)")?(?:\s*%([^,\s]+(?:,[^,\s]+)*))?(?:\s*&con\s*"([^"]+)")?(,)?')
+
+# Operación de un plan <crea>. kind es uno de:
+#   'mkdir'       -> crear el directorio `path` (%Not_extencion)
+#   'create_file' -> crear/sobrescribir el archivo `path` con la cabecera de Aio
+#   'delete_tree' -> borrar `path`, sea directorio (con contenido) o archivo (%all)
+#   'delete_glob' -> borrar los archivos de `path` que coinciden con %patron
+#   'delete_file' -> borrar `path` solo si es un archivo (%borra por nombre o lista de archivos)
+#   'info'/'warn' -> mensaje ya resuelto al compilar (condiciones &con, comandos mal formados)
+# `detail` es el mensaje de las operaciones 'info'/'warn' o el tipo de borrado ('all', 'glob', 'list', 'name').
+# include/exclude son los patrones de %patron y %excepto (tuplas, o None si no se usaron).
+CreaOp = namedtuple('CreaOp', ['kind', 'path', 'detail', 'include', 'exclude'], defaults=(None, None))
+# Plan compilado de un bloque <crea>: operaciones en orden y conflictos crear/borrar detectados
+CreaPlan = namedtuple('CreaPlan', ['ops', 'conflicts'])
+
+_CREA_PLAN_CACHE = {}
+_CREA_PLAN_CACHE_SIZE = 256
+
+_DELETE_WARNINGS = {
+    'all': "Advertencia: '{}' no encontrado para borrado %all.",
+    'glob': "Advertencia: '{}' no encontrado para borrado %patron.",
+    'list': "Advertencia: '{}' no encontrado o no es un archivo para borrado.",
+    'name': "Advertencia: '{}' no encontrado para borrado por nombre.",
+}
+
+# Evalúa la condición &con "pin" contra esp_pin_states; devuelve (se_cumple, estado) con estado None
+# si el pin no existe (en ese caso se asume que se cumple)
+def _evaluate_pin_condition(pin_name):
+    count('pin_evaluations')
+    if pin_name not in esp_pin_states:
+        return True, None
+    state = esp_pin_states[pin_name]
+    if (pin_name == "deploy_success" and state == "no") or (pin_name == "n" and state == "si") or \
+       (pin_name == "p" and state == "no"):
+        return False, state
+    return True, state
+
+# Patrones separados por comas de %patron/%excepto
+def _split_patterns(patterns):
+    patterns = tuple(pattern.strip() for pattern in patterns.split(',') if pattern.strip())
+    return patterns or None
+
+# ¿Coincide la ruta relativa (con '/') con algún patrón? Un patrón sin '/' se compara con el nombre del archivo
+def _match_any(relative_path, patterns):
+    name = relative_path.rsplit('/', 1)[-1]
+    return any(fnmatch.fnmatch(relative_path if '/' in pattern else name, pattern) for pattern in patterns)
+
+# ¿Borra `op` (delete_tree/delete_glob sobre root_key) el archivo file_key según %patron y %excepto?
+def _delete_selects(op, root_key, file_key):
+    relative_path = os.path.basename(file_key) if file_key == root_key else os.path.relpath(file_key, root_key)
+    relative_path = relative_path.replace(os.sep, '/')
+    if op.include and not _match_any(relative_path, op.include):
+        return False
+    return not (op.exclude and _match_any(relative_path, op.exclude))
+
+# Compila el texto de un bloque <crea> a un CreaPlan sin tocar el disco.
+# Los pines &con se evalúan aquí, por eso forman parte de la clave de la caché.
+def compile_crea_block(crea_content, output_dir):
+    import hashlib
+    cache_key = (hashlib.sha256(crea_content.encode('utf-8')).hexdigest(), output_dir,
+                 tuple(sorted(esp_pin_states.items())))
+    plan = _CREA_PLAN_CACHE.get(cache_key)
+    if plan is not None:
+        count('crea_plan_cache_hits')
+        return plan
+
+    ops = []
+    pin_results = {}
+    for line in crea_content.split('\n'):
+        cmd = line.strip()
+        if not cmd or cmd.startswith('#'):
+            continue
+
+        cmd_without_comment = cmd.split('#', 1)[0].strip()
+        count('crea_commands')
+
+        # Comando $crea=file
+        create_match = _CREA_FILE_RE.match(cmd_without_comment)
+        if create_match:
+            name, _, extension, not_extension_flag, _ = create_match.groups()
+            # Reemplaza '_' por '/' en el nombre para la ruta del sistema de archivos
+            full_path_target = os.path.join(output_dir, name.replace('_', os.sep))
+            if not_extension_flag:
+                ops.append(CreaOp('mkdir', full_path_target, None))
+            else:
+                final_file_path = f"{full_path_target}.{extension}" if extension else full_path_target
+                ops.append(CreaOp('create_file', final_file_path, None))
+            continue
+
+        # Comando %borra
+        delete_match = _BORRA_RE.match(cmd_without_comment)
+        if delete_match:
+            (name_to_delete, path_to_delete_relative, all_flag, include_str, exclude_str, specific_files_str,
+             pin_name, _) = delete_match.groups()
+
+            if name_to_delete:
+                target_path_base = os.path.join(output_dir, name_to_delete.replace('_', os.sep))
+            elif path_to_delete_relative:
+                target_path_base = path_to_delete_relative
+                if not os.path.isabs(target_path_base):
+                    target_path_base = os.path.join(output_dir, target_path_base)
+            else:
+                ops.append(CreaOp('warn', None, f"Error: Comando %borra incompleto (falta Name o file): {cmd}"))
+                continue
+
+            if pin_name:
+                # Cada pin se evalúa una sola vez por bloque
+                pin_name = pin_name.strip('"')
+                if pin_name not in pin_results:
+                    pin_results[pin_name] = _evaluate_pin_condition(pin_name)
+                condition_met, state = pin_results[pin_name]
+                if state is None:
+                    ops.append(CreaOp('warn', None, f"Advertencia: Pin '{pin_name}' no encontrado en estados de (esp). "
+                                                    f"No se puede evaluar condición. Asumiendo TRUE."))
+                elif not condition_met:
+                    ops.append(CreaOp('info', None, f"Condición '{pin_name}' no se cumple (estado '{state}'). "
+                                                    f"Borrado no ejecutado para '{target_path_base}'."))
+                    continue
+
+            include = _split_patterns(include_str) if include_str is not None else None
+            exclude = _split_patterns(exclude_str) if exclude_str is not None else None
+            if exclude and not (all_flag or include):
+                ops.append(CreaOp('warn', None, f"Advertencia: %excepto solo se aplica con %all o %patron (ignorado): {cmd}"))
+                exclude = None
+
+            if all_flag:
+                ops.append(CreaOp('delete_tree', target_path_base, 'all', None, exclude))
+            elif include:
+                ops.append(CreaOp('delete_glob', target_path_base, 'glob', include, exclude))
+            elif specific_files_str:
+                for f_name in specific_files_str.split(','):
+                    file_to_delete_path = os.path.join(os.path.dirname(target_path_base), f_name.strip().replace('_', os.sep))
+                    ops.append(CreaOp('delete_file', file_to_delete_path, 'list'))
+            elif name_to_delete:
+                ops.append(CreaOp('delete_file', target_path_base, 'name'))
+            else:
+                ops.append(CreaOp('warn', None, f"Error: Comando %borra válido, pero no especificó qué borrar "
+                                                f"(ej. %all o archivos): {cmd}"))
+            continue
+
+        ops.append(CreaOp('warn', None, f"Advertencia: Comando <crea> no reconocido o mal formado: '{cmd}'"))
+
+    plan = CreaPlan(ops, _find_crea_conflicts(ops))
+    if len(_CREA_PLAN_CACHE) >= _CREA_PLAN_CACHE_SIZE:
+        _CREA_PLAN_CACHE.clear()
+    _CREA_PLAN_CACHE[cache_key] = plan
+    return plan
+
+# Rutas que el mismo bloque crea y después borra (o borra y vuelve a crear).
+# Se comparan por ancestros para que el coste sea lineal en el número de comandos
+# (salvo los borrados con patrones, que revisan lo creado bajo su directorio).
+# Los ancestros se calculan una vez por directorio padre.
+def _find_crea_conflicts(ops):
+    created = {}
+    created_under = {}
+    deleted = {}
+    conflicts = {}
+    parent_ancestors = {}
+    for op in ops:
+        if op.path is None:
+            continue
+        key = os.path.normpath(op.path)
+        parent = os.path.dirname(key)
+        ancestors = parent_ancestors.get(parent)
+        if ancestors is None:
+            ancestors = _ancestors(key)
+            if parent != key:
+                parent_ancestors[parent] = ancestors
+        if op.kind in ('mkdir', 'create_file'):
+            for path in [key] + ancestors:
+                delete_op = deleted.get(path)
+                if delete_op is None or (delete_op.kind == 'delete_file' and path != key):
+                    continue
+                if op.kind == 'mkdir' and delete_op.kind == 'delete_glob':
+                    continue
+                if op.kind == 'create_file' and not _delete_selects(delete_op, path, key):
+                    continue
+                conflicts[(op.path, delete_op.path)] = None
+                break
+            created.setdefault(key, op.path)
+            # Si un ancestro ya está, también lo están los de encima
+            for ancestor in ancestors:
+                if ancestor in created_under:
+                    break
+                created_under[ancestor] = op.path
+            continue
+
+        created_path = created.get(key)
+        if op.kind == 'delete_tree' and not op.exclude:
+            created_path = created_path or created_under.get(key)
+        elif op.kind != 'delete_file' and key in created_under:
+            created_path = next((path for created_key, path in created.items()
+                                 if (created_key == key or _is_under(created_key, key))
+                                 and _delete_selects(op, key, created_key)), None)
+        if created_path is not None:
+            conflicts[(created_path, op.path)] = None
+        deleted[key] = op
+    return list(conflicts)
+
+def _ancestors(path):
+    ancestors = []
+    parent = os.path.dirname(path)
+    while parent and parent != path:
+        ancestors.append(parent)
+        path, parent = parent, os.path.dirname(parent)
+    return ancestors
+
+def _is_under(path, directory):
+    return path.startswith(directory.rstrip(os.sep) + os.sep)
+
+# Índice en memoria del estado de las rutas que toca un plan: un solo recorrido (backend.scan)
+# del ancestro común de las rutas dentro de output_dir. Las rutas fuera de ese subárbol
+# (p. ej. file="..." absoluto) se consultan al backend una a una.
+# Índice {ruta normalizada: 'dir'|'file'} de los árboles que toca el bloque: un solo recorrido
+# (scandir) del directorio común de las rutas dentro de output_dir, más los árboles de fuera
+# que se borran con %all/%patron, que se recorren una vez al llegar a ellos.
+# Todos los métodos reciben rutas ya normalizadas con backend.normalize (una vez por comando).
+class _CreaIndex:
+    def __init__(self, keys, output_dir, backend):
+        self.entries = {}
+        self.roots = set()
+        self.prefixes = ()
+        self.backend = backend
+        output_root = backend.normalize(output_dir)
+        inside = [key for key in keys if key == output_root or _is_under(key, output_root)]
+        if inside:
+            # El directorio común se recorre aunque sea un enlace simbólico (p. ej. un output_dir
+            # enlazado), salvo que algún comando lo tenga a él como destino
+            common = os.path.commonpath(inside)
+            self.index_tree(common, follow_root=common not in inside)
+
+    # Los destinos de %borra se indexan sin seguir enlaces: un enlace a un directorio se borra
+    # como archivo (se quita el enlace), nunca se recorre su contenido
+    def index_tree(self, key, follow_root=False):
+        self.entries.update(self.backend.scan(key, follow_root))
+        self.roots.add(key)
+        self.prefixes += (key.rstrip(os.sep) + os.sep,)
+
+    def indexed(self, key):
+        return key in self.roots or key.startswith(self.prefixes)
+
+    # 'dir', 'file' o None
+    def kind(self, key):
+        if self.indexed(key):
+            return self.entries.get(key)
+        return self.backend.kind(key)
+
+    # Entradas (ruta, tipo) de `key` y de todo lo que cuelga de él
+    def tree(self, key):
+        if not self.indexed(key):
+            self.index_tree(key)
+        prefix = key.rstrip(os.sep) + os.sep
+        return [(entry, kind) for entry, kind in self.entries.items() if entry == key or entry.startswith(prefix)]
+
+    def add(self, key, kind):
+        if not self.indexed(key):
+            return
+        self.entries[key] = kind
+        parent = os.path.dirname(key)
+        while self.entries.get(parent) != 'dir' and self.indexed(parent):
+            self.entries[parent] = 'dir'
+            parent = os.path.dirname(parent)
+
+    def discard(self, keys):
+        for key in keys:
+            self.entries.pop(key, None)
+
+# Conjunto de borrado de un %all/%patron sobre `key` (de tipo `kind`): (archivos, directorios).
+# Con %excepto se conservan los archivos excluidos y los directorios que los contienen.
+def _delete_set(op, index, key, kind):
+    entries = index.tree(key) if kind == 'dir' else [(key, 'file')]
+    files = [entry for entry, entry_kind in entries if entry_kind == 'file' and _delete_selects(op, key, entry)]
+    if op.kind == 'delete_glob':
+        return files, []
+    selected = set(files)
+    kept_dirs = set()
+    for entry, entry_kind in entries:
+        if entry_kind == 'file' and entry not in selected:
+            kept_dirs.update(path for path in _ancestors(entry) if path == key or _is_under(path, key))
+    return files, [entry for entry, entry_kind in entries if entry_kind == 'dir' and entry not in kept_dirs]
+
+# Ejecuta un CreaPlan. Los mensajes se deciden contra el índice (igual que si cada comando
+# consultara el disco en orden) y las operaciones reales se agrupan: los mkdir redundantes
+# se fusionan en los directorios más profundos y el conjunto de borrado se calcula entero
+# de antemano y se borra en bloque (archivos, en paralelo con `workers` hilos, y después los
+# directorios de abajo arriba). backend es el backend de salida (por defecto, el árbol de directorios).
+def execute_crea_plan(plan, output_dir, backend=None, workers=1):
+    backend = backend or DirectoryBackend()
+    for created_path, deleted_path in plan.conflicts:
+        print(f"Advertencia: Conflicto en <crea>: '{created_path}' se crea y se borra ('{deleted_path}') en el mismo bloque.")
+
+    keys = [backend.normalize(op.path) if op.path is not None else None for op in plan.ops]
+    index = _CreaIndex([key for key in keys if key is not None], output_dir, backend)
+    # (tipo, ruta, directorio que hay que crear antes o None si el índice ya lo conoce)
+    pending_creates = []
+    delete_files = set()
+    delete_dirs = set()
+
+    # Los mensajes de creación se imprimen al vaciar el lote, en el orden de los comandos
+    def flush_creates():
+        directories = [directory for _, _, directory in pending_creates if directory]
+        for directory in deepest_dirs(directories) if len(directories) > 1 else directories:
+            backend.makedirs(directory)
+        for kind, path, _ in pending_creates:
+            if kind == 'mkdir':
+                info(f"Directorio creado: '{path}'")
+                continue
+            try:
+                backend.write_text(path, f"# Archivo creado por Aio: {os.path.basename(path)}\n")
+                info(f"Archivo creado: '{path}'")
+            except Exception as e:
+                print(f"Error al crear archivo '{path}': {e}")
+        del pending_creates[:]
+
+    def flush_deletes():
+        if not delete_files and not delete_dirs:
+            return
+        files = sorted(delete_files)
+        for path, error in zip(files, backend.remove_files(files, workers)):
+            if error is not None:
+                print(f"Error al borrar '{path}': {error}")
+        # Directorios de abajo arriba; si alguno no queda vacío (contenido que el índice no
+        # conocía), se borra con su contenido
+        for directory in sorted(delete_dirs, key=lambda path: path.count(os.sep), reverse=True):
+            if backend.remove_empty_dir(directory):
+                continue
+            try:
+                backend.remove_tree(directory)
+            except OSError as e:
+                print(f"Error al borrar '{directory}': {e}")
+        count('deleted_files', len(delete_files))
+        count('deleted_dirs', len(delete_dirs))
+        info(f"Borrado en bloque: {len(delete_files)} archivos y {len(delete_dirs)} directorios.")
+        delete_files.clear()
+        delete_dirs.clear()
+
+    for op, key in zip(plan.ops, keys):
+        if op.kind in ('mkdir', 'create_file') and (delete_files or delete_dirs):
+            flush_deletes()
+        elif op.kind in ('delete_tree', 'delete_glob', 'delete_file') and pending_creates:
+            flush_creates()
+
+        if op.kind in ('info', 'warn'):
+            flush_creates()
+            (info if op.kind == 'info' else print)(op.detail)
+        elif op.kind == 'mkdir':
+            if index.kind(key) is None:
+                pending_creates.append(('mkdir', op.path, key))
+                index.add(key, 'dir')
+            else:
+                flush_creates()
+                info(f"Directorio ya existe: '{op.path}' (ignorado)")
+        elif op.kind == 'create_file':
+            # Un directorio que el índice ya conoce existe en disco o lo crea un comando anterior del lote
+            parent = os.path.dirname(key)
+            pending_creates.append(('create_file', op.path, None if index.kind(parent) == 'dir' else parent))
+            index.add(key, 'file')
+        elif op.kind in ('delete_tree', 'delete_glob'):
+            kind = index.kind(key)
+            if kind is None:
+                print(_DELETE_WARNINGS[op.detail].format(op.path))
+                continue
+            files, directories = _delete_set(op, index, key, kind)
+            delete_files.update(files)
+            delete_dirs.update(directories)
+            index.discard(files + directories)
+            patterns = ','.join(op.include or ())
+            if op.kind == 'delete_glob' and not files:
+                print(f"Advertencia: Ningún archivo de '{op.path}' coincide con '{patterns}'.")
+            elif op.kind == 'delete_glob':
+                info(f"Borrados {len(files)} archivos de '{op.path}' que coinciden con '{patterns}'.")
+            elif key not in directories and kind == 'dir':
+                info(f"Contenido de '{op.path}' borrado salvo %excepto ({len(files)} archivos borrados).")
+            elif kind == 'dir':
+                info(f"Directorio y contenido borrados: '{op.path}'")
+            elif files:
+                info(f"Archivo borrado: '{op.path}'")
+            else:
+                info(f"Archivo '{op.path}' conservado por %excepto.")
+        elif op.kind == 'delete_file':
+            if index.kind(key) != 'file':
+                print(_DELETE_WARNINGS[op.detail].format(op.path))
+                continue
+            delete_files.add(key)
+            index.discard([key])
+            info(f"Archivo borrado: '{op.path}'")
+
+    flush_creates()
+    flush_deletes()
+
+# Imprime un CreaPlan sin tocar el disco (--dry-run)
+def print_crea_plan(plan):
+    print("Plan <crea> (dry-run, no se toca el disco):")
+    for created_path, deleted_path in plan.conflicts:
+        print(f"  conflicto    '{created_path}' se crea y se borra ('{deleted_path}')")
+    covering = set(deepest_dirs([op.path for op in plan.ops if op.kind == 'mkdir'] +
+                                 [os.path.dirname(op.path) for op in plan.ops if op.kind == 'create_file']))
+    for op in plan.ops:
+        if op.kind in ('info', 'warn'):
+            print(f"  # {op.detail}")
+        elif op.kind == 'mkdir':
+            implicit = '' if op.path in covering else ' (implícito)'
+            print(f"  mkdir        '{op.path}'{implicit}")
+        elif op.kind == 'create_file':
+            print(f"  crear        '{op.path}'")
+        elif op.kind in ('delete_tree', 'delete_glob'):
+            label = '%all ' if op.kind == 'delete_tree' else '%patron'
+            patterns = f" {','.join(op.include)}" if op.include else ''
+            excluded = f" (excepto {','.join(op.exclude)})" if op.exclude else ''
+            print(f"  borrar {label} '{op.path}'{patterns}{excluded}")
+        else:
+            print(f"  borrar       '{op.path}'")
+
+# Función para parsear el bloque <crea>
+def parse_crea_block(crea_content, output_dir, dry_run=False, backend=None, workers=1):
+    info("\n--- Procesando comandos <crea> ---")
+    with phase('crea.compile'):
+        plan = compile_crea_block(crea_content, output_dir)
+    if dry_run:
+        print_crea_plan(plan)
+        return plan
+    with phase('crea.execute'):
+        execute_crea_plan(plan, output_dir, backend, workers)
+    return plan
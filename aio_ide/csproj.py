@@ -0,0 +1,195 @@
+# Proyectos .NET del bloque <csproj>: un solo parseo XML incremental por proyecto,
+# caché de resultados por hash de contenido y verificación cruzada con <sln>
+import re
+import os
+import hashlib
+from collections import namedtuple
+
+from .lexer import MappedBlock, block_text
+from .report import count
+
+# Datos de un <Project> extraídos en una sola pasada:
+#   sdk, root_namespace, assembly_name, output_type -> texto (o None)
+#   project_references -> rutas Include de <ProjectReference>
+#   package_references -> (Include, Version) de <PackageReference>
+#   error -> mensaje del ParseError si el XML no es válido (el resto de campos queda vacío)
+CsprojInfo = namedtuple('CsprojInfo', ['sdk', 'root_namespace', 'assembly_name', 'output_type',
+                                       'project_references', 'package_references', 'error'])
+
+_PROJECT_PATTERN = r'<Project Sdk="([^"]+)">\s*(.*?)</Project>'
+_PROJECT_RE = re.compile(_PROJECT_PATTERN, re.DOTALL)
+_PROJECT_RE_BYTES = re.compile(_PROJECT_PATTERN.encode('ascii'), re.DOTALL)
+
+# Proyectos de la solución: Project("{tipo}") = "Nombre", "Ruta\Nombre.csproj", "{guid}"
+_SLN_PROJECT_RE = re.compile(r'^\s*Project\("\{[^}]*\}"\)\s*=\s*"([^"]+)"\s*,\s*"([^"]+)"', re.MULTILINE)
+
+# Caché en memoria: sha256 del XML del proyecto -> CsprojInfo (se persiste en el manifiesto)
+_CSPROJ_CACHE = {}
+
+# Comprueba que un dict leído del manifiesto tiene la forma de CsprojInfo._asdict() (tras pasar por JSON)
+def _valid_csproj_fields(fields):
+    if not isinstance(fields, dict) or set(fields) != set(CsprojInfo._fields):
+        return False
+    if not all(isinstance(fields[name], (str, type(None)))
+               for name in ('sdk', 'root_namespace', 'assembly_name', 'output_type', 'error')):
+        return False
+    project_references = fields['project_references']
+    package_references = fields['package_references']
+    return (isinstance(project_references, list) and all(isinstance(ref, str) for ref in project_references) and
+            isinstance(package_references, list) and all(
+                isinstance(ref, list) and len(ref) == 2 and isinstance(ref[0], str) and
+                isinstance(ref[1], (str, type(None))) for ref in package_references))
+
+# Añade a la caché entradas guardadas en un manifiesto ({sha256: dict de CsprojInfo});
+# las que no tienen esa forma se ignoran (el proyecto se vuelve a parsear)
+def seed_csproj_cache(entries):
+    if not isinstance(entries, dict):
+        return
+    for digest, fields in entries.items():
+        if digest in _CSPROJ_CACHE or not _valid_csproj_fields(fields):
+            continue
+        info = CsprojInfo(**fields)
+        _CSPROJ_CACHE[digest] = info._replace(package_references=[tuple(ref) for ref in info.package_references])
+
+# Entradas de la caché para guardar en el manifiesto
+def csproj_cache_entries(digests):
+    return {digest: _CSPROJ_CACHE[digest]._asdict() for digest in digests if digest in _CSPROJ_CACHE}
+
+# Tamaño de los trozos con los que se alimenta el parser XML
+_XML_CHUNK_SIZE = 64 * 1024
+
+# Parsea el <Project> de source[start:end] con XMLPullParser en una sola pasada, alimentándolo
+# por trozos y descartando cada elemento al cerrarse
+def scan_csproj_project(source, start, end, sdk):
+    import xml.etree.ElementTree as ET # Para parsear XML de CSPROJ (solo si hay bloques <csproj>)
+
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    # Por cada <PropertyGroup>, en orden de aparición: primer texto de cada propiedad que nos interesa
+    property_groups = []
+    open_groups = []
+    output_type = None
+    output_type_seen = False
+    project_references = []
+    package_references = []
+    parents = []
+
+    def handle_events():
+        nonlocal output_type, output_type_seen
+        for event, elem in parser.read_events():
+            if event == 'start':
+                if elem.tag == 'PropertyGroup':
+                    property_groups.append({})
+                    open_groups.append(property_groups[-1])
+                parents.append(elem.tag)
+                continue
+
+            parents.pop()
+            if elem.tag == 'PropertyGroup':
+                open_groups.pop()
+            elif elem.tag in ('RootNamespace', 'AssemblyName') and parents and parents[-1] == 'PropertyGroup':
+                open_groups[-1].setdefault(elem.tag, elem.text)
+            elif elem.tag == 'OutputType' and not output_type_seen:
+                output_type_seen = True
+                output_type = elem.text
+            elif elem.tag == 'ProjectReference' and elem.get('Include'):
+                project_references.append(elem.get('Include'))
+            elif elem.tag == 'PackageReference' and elem.get('Include'):
+                package_references.append((elem.get('Include'), elem.get('Version')))
+            elem.clear()
+
+    try:
+        for chunk_start in range(start, end, _XML_CHUNK_SIZE):
+            parser.feed(source[chunk_start:min(chunk_start + _XML_CHUNK_SIZE, end)])
+            handle_events()
+        parser.close()
+        handle_events()
+    except ET.ParseError as e:
+        return CsprojInfo(sdk, None, None, None, [], [], str(e))
+
+    # Decide el primer PropertyGroup con RootNamespace o AssemblyName (RootNamespace tiene prioridad)
+    root_namespace = assembly_name = None
+    for group in property_groups:
+        if group.get('RootNamespace'):
+            root_namespace = group['RootNamespace'].strip()
+            break
+        if group.get('AssemblyName'):
+            assembly_name = group['AssemblyName'].strip()
+            break
+    return CsprojInfo(sdk, root_namespace, assembly_name, output_type, project_references, package_references, None)
+
+# Nombre de carpeta/proyecto para el proyecto número `index` del bloque
+def csproj_project_name(info, index):
+    if info.error:
+        return f'UnnamedProject_{index}'
+    if info.root_namespace or info.assembly_name:
+        return info.root_namespace or info.assembly_name
+
+    if info.output_type:
+        if "WinExe" in info.output_type or "Exe" in info.output_type:
+            return "DesktopApp" if "WinExe" in info.output_type else "ConsoleApp"
+        if "Library" in info.output_type:
+            return "BusinessLogic"
+
+    if "Web" in info.sdk:
+        return "ApiProject"
+    if "Test" in info.sdk:
+        return "TestsProject"
+    if index == 2: # Tercer csproj en tu .aio es BusinessLogic
+        return "BusinessLogic"
+    return f'UnnamedProject_{index}'
+
+# Recorre los <Project ...> de los bloques <csproj> como (sha256, MappedBlock del XML, CsprojInfo),
+# parseando solo los proyectos cuyo contenido no está en la caché
+def iter_csproj_projects(csproj_blocks):
+    for block in csproj_blocks:
+        if isinstance(block, MappedBlock):
+            source, start, end = block.source, block.start, block.end
+        else:
+            source, start, end = block, 0, len(block)
+        project_re = _PROJECT_RE if isinstance(source, str) else _PROJECT_RE_BYTES
+        for match in project_re.finditer(source, start, end):
+            digest = hashlib.sha256()
+            for chunk_start in range(match.start(), match.end(), _XML_CHUNK_SIZE):
+                chunk = source[chunk_start:min(chunk_start + _XML_CHUNK_SIZE, match.end())]
+                digest.update(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            digest = digest.hexdigest()
+            info = _CSPROJ_CACHE.get(digest)
+            if info is None:
+                sdk = match.group(1)
+                if not isinstance(sdk, str):
+                    sdk = sdk.decode('utf-8')
+                count('csproj_parses')
+                info = _CSPROJ_CACHE[digest] = scan_csproj_project(source, match.start(), match.end(), sdk)
+            else:
+                count('csproj_cache_hits')
+            yield digest, MappedBlock(source, match.start(), match.end()), info
+
+# Proyectos declarados en los bloques <sln>: lista de (nombre, ruta con os.sep) de los .csproj
+def sln_projects(sln_blocks):
+    projects = []
+    for block in sln_blocks:
+        for name, path in _SLN_PROJECT_RE.findall(block_text(block)):
+            if path.lower().endswith('.csproj'):
+                projects.append((name, os.path.normpath(path.replace('\\', os.sep))))
+    return projects
+
+# Compara los proyectos generados ({ruta del .csproj: CsprojInfo}) con la solución y con sus
+# ProjectReference; devuelve los mensajes de advertencia (sin volver a parsear nada)
+def check_csproj_against_sln(generated, solution_projects):
+    warnings = []
+    generated_paths = {os.path.normpath(path) for path in generated}
+    if solution_projects is not None:
+        solution_paths = {path for _, path in solution_projects}
+        for path in generated:
+            if os.path.normpath(path) not in solution_paths:
+                warnings.append(f"Advertencia: El proyecto '{path}' no está en la solución <sln>.")
+        for name, path in solution_projects:
+            if path not in generated_paths:
+                warnings.append(f"Advertencia: La solución <sln> referencia '{name}' ('{path}'), "
+                                f"pero ningún <csproj> lo genera.")
+    for path, info in generated.items():
+        for reference in info.project_references:
+            target = os.path.normpath(os.path.join(os.path.dirname(path), reference.replace('\\', os.sep)))
+            if target not in generated_paths:
+                warnings.append(f"Advertencia: '{path}' referencia '{reference}', que no se genera en esta solución.")
+    return warnings
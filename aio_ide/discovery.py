@@ -0,0 +1,138 @@
+# Descubrimiento recursivo de .aio: recorrido con os.scandir que respeta el archivo .aioignore de la
+# raíz y salta .git, salidas de compilación y los árboles de salida de aio (con .aio_manifest.json).
+# Con un índice (directorio -> mtime, .aio y subdirectorios) las ejecuciones siguientes solo hacen
+# un stat por directorio y vuelven a listar únicamente los directorios cuyo mtime cambió.
+import os
+import fnmatch
+
+from .manifest import AIO_MANIFEST_NAME
+
+AIO_IGNORE_FILE = '.aioignore'
+
+# Directorios que nunca se recorren (control de versiones, cachés, entornos y salidas de compilación)
+DEFAULT_IGNORED_DIRS = ('.git', '.hg', '.svn', '__pycache__', '.aio_cache', 'aio_reports', 'node_modules',
+                        '.venv', 'venv', 'bin', 'obj', 'target')
+
+# Cambia si cambia el formato del índice o las reglas de qué se recorre (invalida los índices guardados)
+_INDEX_VERSION = 1
+
+# Patrones del .aioignore de `root`: uno por línea, '#' para comentarios. Sin '/' se comparan con el
+# nombre; con '/' con la ruta relativa a la raíz; con '/' final solo se aplican a directorios.
+def load_ignore_patterns(root):
+    try:
+        with open(os.path.join(root, AIO_IGNORE_FILE), 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+def _is_ignored(relative_path, name, is_dir, patterns):
+    for pattern in patterns:
+        if pattern.endswith('/'):
+            if not is_dir:
+                continue
+            pattern = pattern.rstrip('/')
+        if '/' in pattern:
+            if fnmatch.fnmatch(relative_path, pattern.lstrip('/')):
+                return True
+        elif fnmatch.fnmatch(name, pattern):
+            return True
+    return False
+
+# Lista un directorio: ([.aio], [subdirectorios a recorrer]). Un árbol de salida no se recorre
+# (salvo la propia raíz, que puede ser su output_dir)
+def _scan_directory(path, relative, patterns):
+    files = []
+    dirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            name = entry.name
+            if name == AIO_MANIFEST_NAME and relative:
+                return [], []
+            entry_relative = f'{relative}/{name}' if relative else name
+            if entry.is_dir(follow_symlinks=False):
+                if name not in DEFAULT_IGNORED_DIRS and not _is_ignored(entry_relative, name, True, patterns):
+                    dirs.append(name)
+            elif name.endswith('.aio') and not _is_ignored(entry_relative, name, False, patterns):
+                files.append(name)
+    return sorted(files), sorted(dirs)
+
+# Índice de un directorio raíz dentro de cache_dir (uno por raíz)
+def _index_path(root, cache_dir):
+    import hashlib
+
+    key = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, f'discovery_{key}.json')
+
+# {ruta relativa con '/': [mtime_ns, [.aio], [subdirectorios]]}; vacío si no existe o no sirve
+def _load_index(index_path, patterns):
+    import json
+
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if index.get('version') != _INDEX_VERSION or index.get('ignore') != patterns:
+        return {}
+    return index.get('dirs', {})
+
+def _save_index(index_path, patterns, directories):
+    import json
+
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': _INDEX_VERSION, 'ignore': patterns, 'dirs': directories}, f)
+        os.replace(temp_path, index_path)
+    except OSError as e:
+        print(f"Advertencia: No se pudo guardar el índice de descubrimiento '{index_path}': {e}")
+
+# .aio de `root` y de todos sus subdirectorios, ordenados. Con cache_dir se usa (y actualiza) el índice
+# de directorios: un directorio con el mismo mtime no se vuelve a listar. Con indexes (un dict del
+# llamador, {raíz: (patrones, índice)}) el índice se conserva además en memoria entre llamadas, como
+# en el modo watch, y no se vuelve a leer del disco. stats, si se pasa, recibe 'listed' (directorios
+# listados) y 'reused' (directorios tomados del índice).
+def discover_aio_files(root='.', cache_dir=None, stats=None, indexes=None):
+    patterns = load_ignore_patterns(root)
+    index_path = _index_path(root, cache_dir) if cache_dir else None
+    memory_key = os.path.abspath(root)
+    if indexes is not None and memory_key in indexes and indexes[memory_key][0] == patterns:
+        previous = indexes[memory_key][1]
+    else:
+        previous = _load_index(index_path, patterns) if index_path else {}
+    directories = {}
+    found = []
+    listed = reused = 0
+    pending = ['']
+    while pending:
+        relative = pending.pop()
+        path = os.path.join(root, *relative.split('/')) if relative else root
+        try:
+            # stat antes de listar: si el directorio cambia mientras tanto, la próxima vez se vuelve a listar
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        entry = previous.get(relative)
+        if entry is not None and entry[0] == mtime_ns:
+            reused += 1
+            files, dirs = entry[1], entry[2]
+        else:
+            try:
+                files, dirs = _scan_directory(path, relative, patterns)
+            except OSError:
+                continue
+            listed += 1
+        directories[relative] = [mtime_ns, files, dirs]
+        found.extend(os.path.normpath(os.path.join(path, name)) for name in files)
+        pending.extend(f'{relative}/{name}' if relative else name for name in reversed(dirs))
+
+    if index_path and directories != previous:
+        _save_index(index_path, patterns, directories)
+    if indexes is not None:
+        indexes[memory_key] = (patterns, directories)
+    if stats is not None:
+        stats['listed'] = listed
+        stats['reused'] = reused
+    return sorted(found)
@@ -0,0 +1,253 @@
+# Etapa de emisión: file_map, manifiesto y comandos <crea> sobre un backend de salida (ver backends.py)
+import os
+import json
+import hashlib
+
+from .lexer import block_text
+# AIO_FSYNC_POLICIES y emit_files se siguen importando desde aquí
+from .backends import AIO_FSYNC_POLICIES, DEFAULT_EMIT_WORKERS, DirectoryBackend, emit_files
+from .crea import esp_pin_states, parse_crea_block
+from .csproj import seed_csproj_cache, csproj_cache_entries
+from .manifest import (load_manifest, save_manifest, manifest_files, file_matches_record,
+                       prune_empty_dirs, content_digest)
+from .planner import plan_file_map, flatten_plan, render_file_parts
+from .report import info, phase, count
+
+# Salidas escritas (o ya al día) en esta ejecución por contenido: sha256 -> (ruta, tamaño, mtime_ns).
+# Con link_identical=True, una salida con el mismo contenido que otra (de este u otro .aio) se crea
+# como enlace duro en lugar de volver a escribirse.
+_EMITTED_BY_DIGEST = {}
+
+# Separa las entradas pendientes en (a escribir, a enlazar): se enlazan las que repiten un contenido
+# ya emitido en esta ejecución o que aparece antes en la misma lista
+def _split_identical(pending):
+    to_write = []
+    to_link = []
+    seen = set(_EMITTED_BY_DIGEST)
+    for entry in pending:
+        digest = entry[3]
+        if digest in seen:
+            to_link.append(entry)
+        else:
+            seen.add(digest)
+            to_write.append(entry)
+    return to_write, to_link
+
+# Salidas que dejaron los planes <crea> ejecutados, para el manifiesto: ruta relativa (con '/') ->
+# {'kind': 'dir'} o {'kind': 'file', 'size', 'mtime_ns'}. Solo las que existen tras la ejecución
+# (un comando posterior del mismo bloque puede haberlas borrado).
+def _crea_outputs(plans, output_dir, backend):
+    outputs = {}
+    for plan in plans:
+        for op in plan.ops:
+            if op.kind not in ('mkdir', 'create_file'):
+                continue
+            manifest_key = os.path.relpath(op.path, output_dir).replace(os.sep, '/')
+            kind = backend.kind(op.path)
+            if op.kind == 'mkdir' and kind == 'dir':
+                outputs[manifest_key] = {'kind': 'dir'}
+            elif op.kind == 'create_file' and kind == 'file':
+                file_stat = backend.stat(op.path)
+                if file_stat is not None:
+                    outputs[manifest_key] = {'kind': 'file', 'size': file_stat[0], 'mtime_ns': file_stat[1]}
+    return outputs
+
+# Comprueba que las salidas de <crea> registradas en el manifiesto siguen en disco tal como quedaron
+def _crea_outputs_match(outputs, output_dir, backend):
+    for manifest_key, record in outputs.items():
+        full_path = os.path.join(output_dir, manifest_key.replace('/', os.sep))
+        if record['kind'] == 'dir':
+            if backend.kind(full_path) != 'dir':
+                return False
+        elif backend.kind(full_path) != 'file' or not file_matches_record(full_path, record, backend):
+            return False
+    return True
+
+# Esta función guardará cada bloque en un archivo separado, gestionando la estructura de VS
+# Solo se reescriben los archivos cuyo contenido cambió (ver manifiesto); force=True lo reescribe todo.
+# emit_workers y fsync configuran la etapa de emisión (ver emit_files).
+# file_map permite pasar un plan ya calculado (modo watch); si no, se genera a partir de los bloques.
+# backend decide dónde se escribe (ver backends.py); por defecto, el árbol de directorios real.
+# dry_run=True solo informa de lo que se escribiría, borraría o ejecutaría en <crea>, sin tocar el disco.
+# link_identical=True enlaza (enlace duro) las salidas idénticas a otra ya emitida en la ejecución.
+# Devuelve los contadores {'written', 'skipped', 'removed'}.
+def save_blocks_to_files(blocks, config, base_name, force=False, emit_workers=DEFAULT_EMIT_WORKERS, fsync='none',
+                         file_map=None, dry_run=False, backend=None, link_identical=False):
+    output_dir = config.get('output_dir', 'build') # Valor por defecto si no está en meta
+    backend = backend or DirectoryBackend()
+    
+    # Crear el directorio base de salida si no existe
+    if dry_run:
+        info(f"[dry-run] Directorio de salida principal '{output_dir}/' (no se modifica el disco).")
+    elif backend.kind(output_dir) is None:
+        backend.makedirs(output_dir)
+        info(f"Directorio de salida principal '{output_dir}/' creado.")
+    else:
+        info(f"Directorio de salida principal '{output_dir}/' ya existe.")
+
+    # Guardar solo los archivos cuyo contenido cambió respecto al manifiesto de output_dir
+    with phase('manifest.load'):
+        manifest = load_manifest(output_dir, backend)
+    # Los proyectos <csproj> ya parseados en ejecuciones anteriores no se vuelven a parsear
+    for source in manifest['sources'].values():
+        seed_csproj_cache(source.get('csproj', {}))
+
+    if file_map is None:
+        file_map = flatten_plan(plan_file_map(blocks, base_name))
+    previous_files = manifest_files(manifest, base_name)
+    # Salidas registradas por otros .aio que escriben en el mismo output_dir
+    claimed_by_others = {}
+    for other_name in manifest['sources']:
+        if other_name != base_name:
+            claimed_by_others.update(manifest_files(manifest, other_name))
+    current_blocks = {}
+    stats = {'written': 0, 'skipped': 0, 'removed': 0}
+
+    # Decide qué entradas cambiaron y las pasa juntas a la etapa de emisión
+    def emit(items):
+        pending = []
+        with phase('emit.diff'):
+            for item in items:
+                prefix, content, suffix = render_file_parts(item, config, output_dir)
+                digest = content_digest(prefix, content, suffix)
+                manifest_key = item['path'].replace(os.sep, '/')
+                full_path = os.path.join(output_dir, item['path'])
+
+                for record in (previous_files.get(manifest_key), claimed_by_others.get(manifest_key)):
+                    if not force and record and record['sha256'] == digest and file_matches_record(full_path, record, backend):
+                        current_blocks.setdefault(item['block'], {})[manifest_key] = record
+                        stats['skipped'] += 1
+                        if link_identical:
+                            _EMITTED_BY_DIGEST.setdefault(digest, (full_path, record['size'], record['mtime_ns']))
+                        break
+                else:
+                    pending.append((item, full_path, manifest_key, digest, prefix, content, suffix))
+
+        if dry_run:
+            for _, full_path, _, _, _, _, _ in pending:
+                info(f"[dry-run] Se escribiría '{full_path}'.")
+            stats['written'] += len(pending)
+            return
+
+        to_link = []
+        if link_identical and backend.supports_links:
+            pending, to_link = _split_identical(pending)
+
+        def record_output(item, full_path, manifest_key, digest, linked):
+            if backend.incremental:
+                size, mtime_ns = backend.stat(full_path)
+                if not linked:
+                    count('bytes_written', size)
+                current_blocks.setdefault(item['block'], {})[manifest_key] = {
+                    'sha256': digest, 'size': size, 'mtime_ns': mtime_ns,
+                }
+                if link_identical:
+                    _EMITTED_BY_DIGEST.setdefault(digest, (full_path, size, mtime_ns))
+            stats['written'] += 1
+
+        errors = backend.write_files([(full_path, prefix, content, suffix)
+                                      for _, full_path, _, _, prefix, content, suffix in pending],
+                                     workers=emit_workers, fsync=fsync)
+        for (item, full_path, manifest_key, digest, _, _, _), error in zip(pending, errors):
+            if error is not None:
+                print(f"Error al generar '{full_path}': {error}")
+                continue
+            record_output(item, full_path, manifest_key, digest, False)
+            info(f"'{full_path}' generado con éxito.")
+
+        # Contenido idéntico a otra salida: enlace duro si el original sigue igual en disco; si no, se escribe
+        for item, full_path, manifest_key, digest, prefix, content, suffix in to_link:
+            source = _EMITTED_BY_DIGEST.get(digest)
+            linked = False
+            if source is not None and source[0] != full_path and backend.stat(source[0]) == source[1:]:
+                try:
+                    backend.link_file(source[0], full_path)
+                    linked = True
+                except OSError:
+                    pass
+            if linked:
+                count('linked_files')
+                record_output(item, full_path, manifest_key, digest, True)
+                info(f"'{full_path}' enlazado a '{source[0]}' (contenido idéntico).")
+                continue
+            error = backend.write_files([(full_path, prefix, content, suffix)], workers=1, fsync=fsync)[0]
+            if error is not None:
+                print(f"Error al generar '{full_path}': {error}")
+                continue
+            record_output(item, full_path, manifest_key, digest, False)
+            info(f"'{full_path}' generado con éxito.")
+
+    # Si dos entradas apuntan a la misma ruta, gana la última (igual que al sobrescribir)
+    unique_items = {}
+    for item in file_map:
+        unique_items.pop(item['path'], None)
+        unique_items[item['path']] = item
+
+    info("\n--- Guardando archivos generados ---")
+    emit(unique_items.values())
+
+    # Borrar las salidas que este .aio generó antes y que ya no produce
+    current_paths = {path for block_files in current_blocks.values() for path in block_files}
+    current_paths.update(item['path'].replace(os.sep, '/') for item in unique_items.values())
+    if blocks['meta_block']:
+        current_paths.add(f'config_{base_name}.meta')
+    with phase('emit.orphans'):
+        for manifest_key in previous_files:
+            if manifest_key in current_paths or manifest_key in claimed_by_others:
+                continue
+            orphan_path = os.path.join(output_dir, manifest_key.replace('/', os.sep))
+            if backend.kind(orphan_path) == 'file':
+                if dry_run:
+                    stats['removed'] += 1
+                    info(f"[dry-run] Se borraría la salida huérfana '{orphan_path}'.")
+                    continue
+                backend.remove(orphan_path)
+                prune_empty_dirs(os.path.dirname(orphan_path), output_dir, backend)
+                stats['removed'] += 1
+                info(f"Salida huérfana borrada: '{orphan_path}'")
+
+    # Procesa el bloque <crea> después de generar los archivos iniciales.
+    # Se omite si el bloque y los pines no cambiaron, no se tocó ningún archivo en esta ejecución
+    # y las salidas que dejó <crea> la última vez (directorios y archivos creados) siguen igual.
+    crea_digest = None
+    crea_outputs = {}
+    if blocks['crea_block']:
+        crea_hash = hashlib.sha256(json.dumps(esp_pin_states, sort_keys=True).encode('utf-8'))
+        for crea_content in blocks['crea_block']:
+            crea_hash.update(block_text(crea_content).encode('utf-8'))
+        crea_digest = crea_hash.hexdigest()
+        previous_source = manifest['sources'].get(base_name, {})
+        crea_outputs = previous_source.get('crea_outputs', {})
+        if (not force and previous_source.get('crea') == crea_digest and not stats['written'] and not stats['removed']
+                and _crea_outputs_match(crea_outputs, output_dir, backend)):
+            info("\n--- Comandos <crea> sin cambios (omitidos) ---")
+        else:
+            with phase('crea'):
+                plans = [parse_crea_block(block_text(crea_content), output_dir, dry_run=dry_run, backend=backend,
+                                          workers=emit_workers)
+                         for crea_content in blocks['crea_block']]
+                if not dry_run:
+                    crea_outputs = _crea_outputs(plans, output_dir, backend)
+
+    # Opcional: guardar el contenido bruto del meta
+    if blocks['meta_block']:
+        written_before = stats['written']
+        emit([{'content': blocks['meta_block'][0], 'path': f'config_{base_name}.meta', 'type': 'meta', 'block': 'meta_block'}])
+        if stats['written'] > written_before and not dry_run:
+            info(f"Configuración meta guardada en '{os.path.join(output_dir, f'config_{base_name}.meta')}'.")
+
+    if not dry_run:
+        csproj_digests = [item['csproj'] for item in unique_items.values() if 'csproj' in item]
+        manifest['sources'][base_name] = {'blocks': current_blocks, 'crea': crea_digest, 'crea_outputs': crea_outputs,
+                                          'csproj': csproj_cache_entries(csproj_digests)}
+        with phase('manifest.save'):
+            save_manifest(output_dir, manifest, backend)
+
+    count('files_written', stats['written'])
+    count('files_skipped', stats['skipped'])
+    count('files_removed', stats['removed'])
+
+    dry_run_tag = " [dry-run]" if dry_run else ""
+    info(f"\nResumen{dry_run_tag} de '{base_name}': {stats['written']} escritos, {stats['skipped']} sin cambios, "
+          f"{stats['removed']} eliminados.")
+    return stats
@@ -0,0 +1,58 @@
+# Composición de .aio: `include=compartido/web.aio ../comun/db.aio` en <meta> (rutas separadas por
+# espacios o ';', ya que <meta> separa sus entradas con comas) añade los bloques de esos fragmentos,
+# con rutas relativas al archivo que los incluye.
+# Los bloques propios van primero, así que tienen prioridad sobre los de los fragmentos (p. ej. el
+# primer <cs>); los fragmentos se añaden en orden de inclusión (en profundidad). Un fragmento que llega
+# por varios caminos se incluye una sola vez y un ciclo de inclusiones es un error. El <meta> de
+# los fragmentos solo se usa para sus propios include=.
+import os
+
+from .lexer import ParsedBlocks
+from .report import count
+
+# Rutas absolutas de los fragmentos que incluye un .aio según su config <meta>
+def include_paths(config, file_path):
+    value = config.get('include')
+    if not value:
+        return []
+    values = value if isinstance(value, list) else value.replace(';', ' ').split()
+    base_dir = os.path.dirname(os.path.abspath(file_path))
+    return [os.path.normpath(os.path.join(base_dir, path.strip('"'))) for path in values if path.strip('"')]
+
+# Resuelve el grafo de inclusiones de file_path y devuelve sus bloques con los de todos los fragmentos.
+# load_fragment(ruta) -> (blocks, config) carga cada fragmento (memoizado por el parser).
+# Lanza ValueError si un fragmento no se puede leer o hay un ciclo.
+def resolve_includes(blocks, config, file_path, load_fragment):
+    root = os.path.abspath(file_path)
+    graph = {}
+    fragments = []
+
+    def visit(path, includes, stack):
+        graph[path] = includes
+        for include in includes:
+            if include in stack:
+                cycle = stack[stack.index(include):] + [include]
+                raise ValueError("Inclusión circular: " + ' -> '.join(os.path.relpath(step) for step in cycle))
+            if include in graph:
+                continue # Ya incluido por otro camino
+            fragment_blocks, fragment_config = load_fragment(include)
+            fragments.append(fragment_blocks)
+            visit(include, include_paths(fragment_config, include), stack + [include])
+
+    visit(root, include_paths(config, file_path), [root])
+
+    # Las secciones 'File:' guardadas para bloques que no son del propio archivo pueden ser de
+    # otra versión de un fragmento: se descartan y el planificador las vuelve a buscar
+    split_sections = getattr(blocks, 'split_sections', {})
+    for key, index in list(split_sections):
+        if index >= len(blocks.get(key, [])):
+            del split_sections[(key, index)]
+
+    merged = ParsedBlocks({key: list(contents) for key, contents in blocks.items()},
+                          split_sections=split_sections, include_graph=graph)
+    for fragment_blocks in fragments:
+        for key, contents in fragment_blocks.items():
+            if key != 'meta_block':
+                merged.setdefault(key, []).extend(contents)
+    count('included_fragments', len(fragments))
+    return merged
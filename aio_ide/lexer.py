@@ -0,0 +1,237 @@
+# Lexer de bloques .aio: tabla indexada de bloques, modo streaming (mmap) y MappedBlock
+import re
+import os
+import mmap
+from collections import namedtuple
+
+# Etiquetas de bloque reconocidas: (clave en el dict `blocks`, etiqueta de apertura, etiqueta de cierre)
+AIO_BLOCK_TAGS = [
+    ('html', '<video>', '</video>'),
+    ('css', '<cs>', '</cs>'),
+    ('js', '<tp>', '</tp>'),
+    ('esp', '(esp)', '(/esp)'),
+    ('ing', '<ING>', '</ING>'),
+    ('net', '<net>', '</net>'),
+    ('lua', '<lua>', '</lua>'),
+    ('pat', '(pat)', '(/pat)'),
+    ('rs', '<rs>', '</rs>'),
+    ('go', '<go>', '</go>'),
+    ('sql', '<sql>', '</sql>'),
+    ('meta_block', '<meta>', '</meta>'),
+    ('crea_block', '<crea>', '</crea>'),
+    ('sln', '<sln>', '</sln>'),
+    ('xaml', '<xaml>', '</xaml>'),
+    ('config', '<config>', '</config>'),
+    ('csproj', '<csproj>', '</csproj>'),
+]
+
+# Entrada de la tabla de bloques: offsets del contenido (sin las etiquetas) y líneas (base 1)
+AioBlock = namedtuple('AioBlock', ['key', 'tag', 'start', 'end', 'line_start', 'line_end'])
+
+# Problema de etiquetas detectado por el lexer: 'unclosed', 'nested' o 'unmatched_close'
+AioTagProblem = namedtuple('AioTagProblem', ['kind', 'tag', 'offset', 'line'])
+
+# token literal -> (clave, etiqueta como texto, token de cierre, es_cierre); versión str y bytes
+_BLOCK_TOKENS = {}
+_BLOCK_TOKENS_BYTES = {}
+for _key, _open_tag, _close_tag in AIO_BLOCK_TAGS:
+    _BLOCK_TOKENS[_open_tag] = (_key, _open_tag, _close_tag, False)
+    _BLOCK_TOKENS[_close_tag] = (_key, _close_tag, _close_tag, True)
+    _BLOCK_TOKENS_BYTES[_open_tag.encode('ascii')] = (_key, _open_tag, _close_tag.encode('ascii'), False)
+    _BLOCK_TOKENS_BYTES[_close_tag.encode('ascii')] = (_key, _close_tag, _close_tag.encode('ascii'), True)
+
+# Una sola expresión con todas las etiquetas de apertura y cierre
+_BLOCK_TOKEN_RE = re.compile('|'.join(re.escape(token) for token in _BLOCK_TOKENS))
+_BLOCK_TOKEN_RE_BYTES = re.compile(b'|'.join(re.escape(token) for token in _BLOCK_TOKENS_BYTES))
+
+_TAG_PROBLEM_MESSAGES = {
+    'unclosed': "Advertencia: Etiqueta {tag} sin cerrar en la línea {line} (offset {offset}). Bloque ignorado.",
+    'nested': "Advertencia: Etiqueta {tag} anidada dentro de otro bloque en la línea {line} (offset {offset}). Se trata como contenido.",
+    'unmatched_close': "Advertencia: Etiqueta de cierre {tag} sin apertura en la línea {line} (offset {offset}).",
+}
+
+# Mensaje legible para un AioTagProblem
+def format_tag_problem(problem):
+    return _TAG_PROBLEM_MESSAGES[problem.kind].format(tag=problem.tag, line=problem.line, offset=problem.offset)
+
+# Tamaño de los trozos al recorrer o copiar regiones de un archivo mapeado en memoria
+_MAPPED_CHUNK_SIZE = 1024 * 1024
+
+# Espacios que str.strip() elimina y que pueden aparecer como bytes sueltos en UTF-8
+_ASCII_WHITESPACE = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+
+# Cuenta saltos de línea en content[start:end]; en bytes/mmap lo hace por trozos para no copiar la región entera
+def _count_newlines(content, start, end):
+    if isinstance(content, str):
+        return content.count('\n', start, end)
+    count = 0
+    for chunk_start in range(start, end, _MAPPED_CHUNK_SIZE):
+        count += content[chunk_start:min(chunk_start + _MAPPED_CHUNK_SIZE, end)].count(b'\n')
+    return count
+
+# Normaliza saltos de línea como lo hace open(..., 'r') (universal newlines)
+def _normalize_newlines(data):
+    return data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+# Devuelve content[start:end] como texto, tanto para str como para bytes/mmap
+def _slice_text(content, start, end):
+    if isinstance(content, str):
+        return content[start:end]
+    return _normalize_newlines(content[start:end]).decode('utf-8')
+
+# Lexer de una sola pasada: generador que recorre el contenido (str, bytes o mmap) una vez,
+# reconoce las etiquetas de apertura/cierre y produce un AioBlock por cada bloque cerrado.
+# Los problemas encontrados se añaden a `problems` si se pasa una lista.
+def iter_aio_blocks(content, problems=None):
+    if isinstance(content, str):
+        token_re, tokens = _BLOCK_TOKEN_RE, _BLOCK_TOKENS
+    else:
+        token_re, tokens = _BLOCK_TOKEN_RE_BYTES, _BLOCK_TOKENS_BYTES
+    if problems is None:
+        problems = []
+
+    missing_close = set()  # claves sin ningún cierre restante en el contenido
+    line = 1
+    line_offset = 0  # posición hasta la que ya se contaron las líneas
+    pos = 0
+    while True:
+        match = token_re.search(content, pos)
+        if match is None:
+            return
+        offset = match.start()
+        line += _count_newlines(content, line_offset, offset)
+        line_offset = offset
+        key, tag, close_token, is_close = tokens[match.group(0)]
+        pos = match.end()
+
+        if is_close:
+            problems.append(AioTagProblem('unmatched_close', tag, offset, line))
+            continue
+
+        # Primer cierre de la misma etiqueta después de la apertura (igual que `(.*?)`)
+        close_offset = -1 if key in missing_close else content.find(close_token, pos)
+        if close_offset == -1:
+            missing_close.add(key)
+            problems.append(AioTagProblem('unclosed', tag, offset, line))
+            continue
+
+        # Todo lo que hay entre apertura y cierre es contenido del bloque
+        start_line = line
+        for nested in token_re.finditer(content, pos, close_offset):
+            if tokens[nested.group(0)][3]:
+                continue
+            line += _count_newlines(content, line_offset, nested.start())
+            line_offset = nested.start()
+            problems.append(AioTagProblem('nested', tokens[nested.group(0)][1], nested.start(), line))
+
+        line += _count_newlines(content, line_offset, close_offset)
+        line_offset = close_offset
+        yield AioBlock(key, tag, pos, close_offset, start_line, line)
+        pos = close_offset + len(close_token)
+
+# Construye la tabla indexada completa de bloques y la lista de problemas de etiquetas
+def scan_aio_blocks(content):
+    problems = []
+    block_table = list(iter_aio_blocks(content, problems))
+    return block_table, problems
+
+# Abre un archivo .aio como mapa de memoria de solo lectura (b'' si está vacío)
+def map_aio_file(file_path):
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+# Modo streaming: produce los registros de bloque de un archivo .aio mapeado en memoria sin leerlo entero
+def iter_aio_file_blocks(file_path, problems=None):
+    yield from iter_aio_blocks(map_aio_file(file_path), problems)
+
+# Referencia perezosa a una región de un bloque: un archivo mapeado en memoria (bytes/mmap)
+# o un texto ya leído (str, p. ej. una sección 'File:' dentro de un bloque).
+# El texto solo se materializa al pedirlo; write_to() copia la región directamente al archivo de salida.
+class MappedBlock:
+    __slots__ = ('source', 'start', 'end')
+
+    def __init__(self, source, start, end):
+        self.source = source
+        self.start = start
+        self.end = end
+
+    def text(self):
+        return _slice_text(self.source, self.start, self.end)
+
+    def __str__(self):
+        return self.text()
+
+    # Límites de la región sin espacios en los extremos (equivalente a .strip() sin copiar)
+    def strip_bounds(self):
+        start, end = self.start, self.end
+        if isinstance(self.source, str):
+            while start < end and self.source[start].isspace():
+                start += 1
+            while end > start and self.source[end - 1].isspace():
+                end -= 1
+            return start, end
+        while start < end and self.source[start] in _ASCII_WHITESPACE:
+            start += 1
+        while end > start and self.source[end - 1] in _ASCII_WHITESPACE:
+            end -= 1
+        return start, end
+
+    # Recorre el contenido (sin espacios en los extremos) por trozos de bytes UTF-8, con saltos de línea normalizados
+    def iter_chunks(self):
+        start, end = self.strip_bounds()
+        if isinstance(self.source, str):
+            for chunk_start in range(start, end, _MAPPED_CHUNK_SIZE):
+                yield self.source[chunk_start:min(chunk_start + _MAPPED_CHUNK_SIZE, end)].encode('utf-8')
+            return
+        while start < end:
+            chunk_end = min(start + _MAPPED_CHUNK_SIZE, end)
+            data = self.source[start:chunk_end]
+            if chunk_end < end and data.endswith(b'\r'):
+                # No partir un '\r\n' entre dos trozos
+                data = data[:-1]
+                chunk_end -= 1
+            yield _normalize_newlines(data)
+            start = chunk_end
+
+    # Copia el contenido (sin espacios en los extremos) a un archivo binario por trozos
+    def write_to(self, binary_file):
+        for data in self.iter_chunks():
+            if os.linesep != '\n':
+                data = data.replace(b'\n', os.linesep.encode('ascii'))
+            binary_file.write(data)
+
+# Devuelve el texto de un bloque, sea un str o un MappedBlock
+def block_text(block):
+    return block if isinstance(block, str) else block.text()
+
+# Escribe un bloque (sin espacios en los extremos) en un archivo de texto abierto
+def write_block_content(f, content):
+    if isinstance(content, MappedBlock):
+        f.flush()
+        content.write_to(f.buffer)
+    else:
+        f.write(content.strip())
+
+# Dict `blocks` (clave -> lista de contenidos) que además guarda las secciones 'File:' ya
+# encontradas en sus bloques: split_sections[(clave, índice del bloque)] = [(ruta, inicio, fin)],
+# con offsets relativos al inicio del bloque. El planificador las rellena y la caché de parseo
+# las persiste, así que un .aio sin cambios no vuelve a buscar sus comentarios 'File:'.
+# include_graph es el grafo de inclusiones resuelto ({ruta absoluta: [rutas incluidas]}, ver includes.py).
+class ParsedBlocks(dict):
+    def __init__(self, *args, split_sections=None, include_graph=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.split_sections = {} if split_sections is None else split_sections
+        self.include_graph = {} if include_graph is None else include_graph
+
+# Construye el dict `blocks` (clave -> lista de contenidos) a partir de la tabla de bloques.
+# Con un archivo mapeado, los contenidos son MappedBlock en lugar de copias del texto.
+def blocks_from_table(content, block_table, split_sections=None):
+    blocks = ParsedBlocks({key: [] for key, _, _ in AIO_BLOCK_TAGS}, split_sections=split_sections)
+    for block in block_table:
+        if isinstance(content, str):
+            blocks[block.key].append(content[block.start:block.end])
+        else:
+            blocks[block.key].append(MappedBlock(content, block.start, block.end))
+    return blocks
@@ -0,0 +1,101 @@
+# Manifiesto de salidas generadas (.aio_manifest.json) para la regeneración incremental
+import os
+import json
+import hashlib
+
+from .backends import DirectoryBackend, iter_file_bytes
+
+# Nombre y versión del manifiesto de salidas generadas que se guarda en output_dir
+AIO_MANIFEST_NAME = '.aio_manifest.json'
+AIO_MANIFEST_VERSION = 1
+
+# Registro de una salida: {sha256, size, mtime_ns} (en 'blocks') o, en 'crea_outputs', {kind: 'dir'}
+# o {kind: 'file', size, mtime_ns}
+def _valid_record(record, crea=False):
+    if not isinstance(record, dict):
+        return False
+    if crea and record.get('kind') == 'dir':
+        return True
+    if crea and record.get('kind') != 'file':
+        return False
+    return (type(record.get('size')) is int and type(record.get('mtime_ns')) is int and
+            (crea or isinstance(record.get('sha256'), str)))
+
+# Comprueba que el manifiesto leído tiene la forma que escribe save_blocks_to_files
+# (las entradas de 'csproj' las valida seed_csproj_cache una a una)
+def _valid_manifest(manifest):
+    sources = manifest.get('sources', {})
+    if not isinstance(sources, dict):
+        return False
+    for source in sources.values():
+        if not isinstance(source, dict):
+            return False
+        blocks = source.get('blocks', {})
+        crea_outputs = source.get('crea_outputs', {})
+        if not (isinstance(blocks, dict) and isinstance(crea_outputs, dict) and
+                isinstance(source.get('csproj', {}), dict) and isinstance(source.get('crea'), (str, type(None)))):
+            return False
+        if not all(isinstance(block_files, dict) and all(_valid_record(record) for record in block_files.values())
+                   for block_files in blocks.values()):
+            return False
+        if not all(_valid_record(record, crea=True) for record in crea_outputs.values()):
+            return False
+    return True
+
+# Carga el manifiesto de output_dir; si no existe o no se puede leer, devuelve uno vacío.
+# backend es el backend de salida (por defecto el árbol de directorios).
+def load_manifest(output_dir, backend=None):
+    backend = backend or DirectoryBackend()
+    manifest_path = os.path.join(output_dir, AIO_MANIFEST_NAME)
+    empty_manifest = {'version': AIO_MANIFEST_VERSION, 'sources': {}}
+    if not backend.incremental:
+        return empty_manifest
+    try:
+        data = backend.read_bytes(manifest_path)
+        if data is None:
+            return empty_manifest
+        manifest = json.loads(data.decode('utf-8'))
+    except (OSError, ValueError) as e:
+        print(f"Advertencia: Manifiesto '{manifest_path}' ilegible ({e}). Se regenerarán todas las salidas.")
+        return empty_manifest
+    if not isinstance(manifest, dict) or manifest.get('version') != AIO_MANIFEST_VERSION:
+        return empty_manifest
+    if not _valid_manifest(manifest):
+        print(f"Advertencia: Manifiesto '{manifest_path}' con un formato inesperado. Se regenerarán todas las salidas.")
+        return empty_manifest
+    manifest.setdefault('sources', {})
+    return manifest
+
+# Guarda el manifiesto de forma atómica (archivo temporal + os.replace); los backends no incrementales no lo guardan
+def save_manifest(output_dir, manifest, backend=None):
+    backend = backend or DirectoryBackend()
+    if backend.incremental:
+        backend.write_bytes(os.path.join(output_dir, AIO_MANIFEST_NAME),
+                            json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+# Registros del manifiesto de un .aio aplanados: ruta relativa (con '/') -> {sha256, size, mtime_ns}
+def manifest_files(manifest, base_name):
+    source = manifest['sources'].get(base_name, {})
+    return {path: record for block_files in source.get('blocks', {}).values() for path, record in block_files.items()}
+
+# Comprueba con un solo stat que el archivo en disco sigue siendo el que registró el manifiesto
+def file_matches_record(full_path, record, backend=None):
+    file_stat = (backend or DirectoryBackend()).stat(full_path)
+    return file_stat is not None and file_stat == (record.get('size'), record.get('mtime_ns'))
+
+# Borra directorios vacíos desde `directory` hacia arriba sin salir de `stop_dir`
+def prune_empty_dirs(directory, stop_dir, backend=None):
+    backend = backend or DirectoryBackend()
+    stop_dir = os.path.abspath(stop_dir)
+    directory = os.path.abspath(directory)
+    while directory != stop_dir and directory.startswith(stop_dir + os.sep):
+        if not backend.remove_empty_dir(directory):
+            break
+        directory = os.path.dirname(directory)
+
+# Hash SHA-256 del contenido final de un archivo (sin materializar los MappedBlock)
+def content_digest(prefix, content, suffix):
+    digest = hashlib.sha256()
+    for chunk in iter_file_bytes(prefix, content, suffix):
+        digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,200 @@
+# Caché de parseo persistente: por cada .aio se guarda (en JSON) la tabla de bloques, los
+# problemas de etiquetas, la configuración <meta> y las secciones 'File:' ya encontradas.
+# JSON y no pickle: una entrada manipulada en .aio_cache/ no debe poder ejecutar código, y una
+# entrada con otra forma cuenta como fallo de caché.
+# Una entrada vale si coinciden (tamaño, mtime) del .aio o, si solo cambió el mtime, el sha256
+# del contenido. El directorio tiene un tamaño máximo: se borran las entradas menos usadas.
+import os
+
+from .lexer import AIO_BLOCK_TAGS, AioBlock, AioTagProblem, blocks_from_table
+from .report import count
+
+AIO_CACHE_DIR = '.aio_cache'
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Cambia si cambia el formato de las entradas o lo que produce el lexer (invalida la caché entera)
+_CACHE_VERSION = 2
+
+# sha256 del contenido tal como se parsea (str como UTF-8, bytes o mmap directamente)
+def content_sha256(content):
+    import hashlib
+
+    return hashlib.sha256(content.encode('utf-8') if isinstance(content, str) else content).hexdigest()
+
+# ¿Es `rows` una lista de listas con exactamente los tipos de `types`? (bool no vale como int)
+def _valid_rows(rows, types):
+    return isinstance(rows, list) and all(
+        isinstance(row, list) and len(row) == len(types) and
+        all(type(value) is value_type for value, value_type in zip(row, types)) for row in rows)
+
+_BLOCK_TYPES = (str, str, int, int, int, int)
+_PROBLEM_TYPES = (str, str, int, int)
+_SECTION_TYPES = (str, int, int)
+
+# Entrada leída del JSON -> entrada en memoria (split_sections como dict con claves (clave, índice)),
+# o None si no tiene exactamente la forma que escribe flush()
+def _decode_entry(entry):
+    if not isinstance(entry, dict) or entry.get('version') != _CACHE_VERSION:
+        return None
+    if not (type(entry.get('size')) is int and type(entry.get('mtime_ns')) is int and
+            isinstance(entry.get('sha256'), str) and isinstance(entry.get('path'), str)):
+        return None
+    if not (_valid_rows(entry.get('block_table'), _BLOCK_TYPES) and
+            _valid_rows(entry.get('tag_problems'), _PROBLEM_TYPES)):
+        return None
+    block_keys = {key for key, _, _ in AIO_BLOCK_TAGS}
+    if not all(key in block_keys and 0 <= start <= end <= entry['size']
+               for key, _, start, end, _, _ in entry['block_table']):
+        return None
+    config = entry.get('config')
+    if not isinstance(config, dict) or not all(
+            isinstance(value, str) or (isinstance(value, list) and all(isinstance(item, str) for item in value))
+            for value in config.values()):
+        return None
+    split_sections = {}
+    raw_sections = entry.get('split_sections')
+    if not isinstance(raw_sections, list):
+        return None
+    for row in raw_sections:
+        if not (isinstance(row, list) and len(row) == 3 and isinstance(row[0], str) and type(row[1]) is int
+                and _valid_rows(row[2], _SECTION_TYPES)):
+            return None
+        split_sections[(row[0], row[1])] = [tuple(section) for section in row[2]]
+    return dict(entry, split_sections=split_sections)
+
+# Entrada en memoria -> objeto JSON (las claves (clave, índice) de split_sections pasan a listas)
+def _encode_entry(entry):
+    sections = [[key, index, [list(section) for section in sections]]
+                for (key, index), sections in entry['split_sections'].items()]
+    return dict(entry, split_sections=sections)
+
+class ParseCache:
+    def __init__(self, cache_dir=AIO_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # (ruta de la entrada, entrada, nº de secciones guardadas o -1 si hay que escribirla)
+        self.pending = []
+
+    # Un archivo por .aio y modo (texto o streaming: los offsets de la tabla son distintos)
+    def entry_path(self, file_path, stream):
+        import hashlib
+
+        key = f"{os.path.abspath(file_path)}\0{'stream' if stream else 'text'}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+    # Devuelve (blocks, config, problemas de etiquetas) desde la caché, o None si no hay una entrada válida.
+    # file_stat debe tomarse antes de leer `content`.
+    def load(self, file_path, file_stat, content, stream=False):
+        import json
+
+        entry_path = self.entry_path(file_path, stream)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = _decode_entry(json.load(f))
+        except (OSError, ValueError, RecursionError):
+            # Sin entrada o corrupta: se vuelve a parsear y se sobrescribe
+            entry = None
+        if entry is None or entry['size'] != file_stat.st_size:
+            count('parse_cache_misses')
+            return None
+
+        saved_sections = len(entry['split_sections'])
+        if entry['mtime_ns'] != file_stat.st_mtime_ns:
+            # Mismo tamaño y otro mtime (touch, checkout...): decide el contenido
+            count('parse_cache_hash_checks')
+            if content_sha256(content) != entry['sha256']:
+                count('parse_cache_misses')
+                return None
+            entry['mtime_ns'] = file_stat.st_mtime_ns
+            saved_sections = -1
+        else:
+            try:
+                os.utime(entry_path) # Marca de uso para el LRU
+            except OSError:
+                pass
+        count('parse_cache_hits')
+        self.pending.append((entry_path, entry, saved_sections))
+
+        block_table = [AioBlock._make(block) for block in entry['block_table']]
+        tag_problems = [AioTagProblem._make(problem) for problem in entry['tag_problems']]
+        blocks = blocks_from_table(content, block_table, entry['split_sections'])
+        return blocks, dict(entry['config']), tag_problems
+
+    # Config <meta> de la entrada de file_path (de texto o de streaming) si sigue valiendo por (tamaño, mtime),
+    # o None. Para consultas baratas antes de procesar (fragmentos incluidos, output_dir): no cuenta aciertos.
+    def cached_config(self, file_path, file_stat):
+        import json
+
+        for stream in (False, True):
+            try:
+                with open(self.entry_path(file_path, stream), 'r', encoding='utf-8') as f:
+                    entry = _decode_entry(json.load(f))
+            except (OSError, ValueError, RecursionError):
+                continue
+            if entry is not None and (entry['size'], entry['mtime_ns']) == (file_stat.st_size, file_stat.st_mtime_ns):
+                return dict(entry['config'])
+        return None
+
+    # Prepara la entrada de un .aio recién parseado; se escribe en flush(), después del plan,
+    # para incluir las secciones 'File:' que el planificador guarde en blocks.split_sections
+    def record(self, file_path, file_stat, content, stream, block_table, tag_problems, config, blocks):
+        entry = {
+            'version': _CACHE_VERSION,
+            'path': os.path.abspath(file_path),
+            'size': file_stat.st_size,
+            'mtime_ns': file_stat.st_mtime_ns,
+            'sha256': content_sha256(content),
+            'block_table': [list(block) for block in block_table],
+            'tag_problems': [list(problem) for problem in tag_problems],
+            'config': {key: list(value) if isinstance(value, list) else value for key, value in config.items()},
+            'split_sections': blocks.split_sections,
+        }
+        self.pending.append((self.entry_path(file_path, stream), entry, -1))
+
+    # Escribe las entradas nuevas o que cambiaron y aplica el límite de tamaño
+    def flush(self):
+        import json
+
+        written = 0
+        for entry_path, entry, saved_sections in self.pending:
+            if saved_sections == len(entry['split_sections']):
+                continue
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                temp_path = f"{entry_path}.{os.getpid()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(_encode_entry(entry), f, separators=(',', ':'))
+                os.replace(temp_path, entry_path)
+                written += 1
+            except OSError as e:
+                print(f"Advertencia: No se pudo guardar la caché de parseo '{entry_path}': {e}")
+        self.pending = []
+        count('parse_cache_writes', written)
+        if written:
+            self.evict()
+
+    # LRU por tamaño: borra las entradas usadas hace más tiempo hasta quedar por debajo de max_bytes
+    # (incluidas las .pickle que dejaron versiones anteriores de la caché)
+    def evict(self):
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(('.json', '.pickle')) and entry.is_file():
+                        entry_stat = entry.stat()
+                        entries.append((entry_stat.st_mtime_ns, entry_stat.st_size, entry.path))
+                        total += entry_stat.st_size
+        except OSError:
+            return
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            count('parse_cache_evictions')
+            total -= size
+            if total <= self.max_bytes:
+                break
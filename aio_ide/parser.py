@@ -0,0 +1,126 @@
+# Parseo de archivos .aio: bloque <meta> y dict `blocks`
+import os
+
+from .lexer import scan_aio_blocks, blocks_from_table, map_aio_file, format_tag_problem, _slice_text
+from .includes import include_paths, resolve_includes
+from .report import info, phase, count
+
+# Función para leer el bloque <meta> y extraer configuraciones
+def parse_meta_block(content, block_table=None):
+    if block_table is None:
+        block_table, _ = scan_aio_blocks(content)
+    meta_block = next((block for block in block_table if block.key == 'meta_block'), None)
+    if meta_block is not None:
+        meta_content = _slice_text(content, meta_block.start, meta_block.end).strip()
+        config = {}
+        for line in meta_content.split(','):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if '=' in line:
+                key, value = line.split('=', 1)
+                key = key.strip()
+                value = value.strip()
+                if value.startswith('[') and value.endswith(']'):
+                    config[key] = [item.strip().strip('"') for item in value[1:-1].split(',')]
+                else:
+                    config[key] = value.strip('"')
+        return config
+    return {}
+
+# Parsea contenido .aio ya cargado (str, bytes o mmap) sin imprimir nada.
+# Devuelve (blocks, config, problemas de etiquetas).
+def parse_aio_content(content):
+    blocks, config, tag_problems, _ = _parse_aio_table(content)
+    return blocks, config, tag_problems
+
+# Como parse_aio_content, pero devuelve también la tabla de bloques (para la caché de parseo)
+def _parse_aio_table(content):
+    count('input_bytes', len(content))
+    with phase('parse.lex'):
+        block_table, tag_problems = scan_aio_blocks(content)
+    with phase('parse.meta'):
+        config = parse_meta_block(content, block_table)
+    with phase('parse.blocks'):
+        blocks = blocks_from_table(content, block_table)
+    count('blocks', len(block_table))
+    return blocks, config, tag_problems, block_table
+
+# Lee un .aio como texto o como mapa de memoria. Con with_stat=True devuelve también su stat,
+# tomado antes de leer: si el archivo cambia mientras tanto, la caché de parseo no lo da por válido.
+def _read_aio(file_path, stream, with_stat):
+    file_stat = os.stat(file_path) if with_stat else None
+    if stream:
+        return file_stat, map_aio_file(file_path)
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return file_stat, file.read()
+
+# Parsea un .aio ya leído, reutilizando la entrada de la caché de parseo si sigue siendo válida
+def _parse_read_content(file_path, file_stat, content, stream, cache):
+    cached = None
+    if cache is not None:
+        with phase('parse.cache'):
+            cached = cache.load(file_path, file_stat, content, stream)
+    if cached is not None:
+        count('input_bytes', len(content))
+        return cached
+    blocks, config, tag_problems, block_table = _parse_aio_table(content)
+    if cache is not None:
+        cache.record(file_path, file_stat, content, stream, block_table, tag_problems, config, blocks)
+    return blocks, config, tag_problems
+
+# Fragmentos incluidos ya parseados en esta ejecución:
+# (ruta absoluta, stream) -> ((tamaño, mtime_ns), blocks, config)
+_FRAGMENTS = {}
+
+# Carga un fragmento incluido; se parsea una sola vez por ejecución mientras no cambie en disco
+def _load_fragment(fragment_path, stream=False, cache=None):
+    try:
+        file_stat = os.stat(fragment_path)
+        signature = (file_stat.st_size, file_stat.st_mtime_ns)
+        memo = _FRAGMENTS.get((fragment_path, stream))
+        if memo is not None and memo[0] == signature:
+            count('fragment_memo_hits')
+            return memo[1], memo[2]
+        with phase('parse.read'):
+            _, content = _read_aio(fragment_path, stream, False)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"No se pudo leer el fragmento incluido '{fragment_path}': {e}")
+
+    blocks, config, tag_problems = _parse_read_content(fragment_path, file_stat, content, stream, cache)
+    for problem in tag_problems:
+        print(f"{fragment_path}: {format_tag_problem(problem)}")
+    count('fragment_parses')
+    _FRAGMENTS[(fragment_path, stream)] = (signature, blocks, config)
+    return blocks, config
+
+# Esta función lee un archivo .aio y extrae los bloques de código
+# Con stream=True el archivo se mapea en memoria y los bloques se devuelven como MappedBlock.
+# Con una ParseCache (ver parse_cache.py) un archivo sin cambios no se vuelve a parsear; quien la pasa
+# debe llamar a cache.flush() después de planificar para guardar las entradas nuevas.
+# Los fragmentos de `include=` en <meta> se resuelven aquí (ver includes.py).
+def parse_aio_file(file_path, stream=False, cache=None):
+    info(f"\n--- Procesando archivo: {file_path} ---")
+    try:
+        with phase('parse.read'):
+            file_stat, content = _read_aio(file_path, stream, cache is not None)
+    except FileNotFoundError:
+        print(f"Error: El archivo '{file_path}' no fue encontrado. Asegúrese de que existe y el nombre es correcto.")
+        return None, {}
+    except Exception as e:
+        print(f"Error al leer el archivo '{file_path}': {e}")
+        return None, {}
+
+    blocks, config, tag_problems = _parse_read_content(file_path, file_stat, content, stream, cache)
+    for problem in tag_problems:
+        print(format_tag_problem(problem))
+
+    if include_paths(config, file_path):
+        try:
+            with phase('parse.includes'):
+                blocks = resolve_includes(blocks, config, file_path,
+                                          lambda fragment_path: _load_fragment(fragment_path, stream, cache))
+        except ValueError as e:
+            print(f"Error: {e}")
+            return None, {}
+    return blocks, config
@@ -0,0 +1,238 @@
+# Plan de salidas (file_map): qué archivo se genera a partir de cada bloque
+import re
+import os
+from collections import namedtuple
+
+from .lexer import MappedBlock
+from .csproj import iter_csproj_projects, csproj_project_name, sln_projects, check_csproj_against_sln
+from .report import info, phase, count
+
+# Contenido final de una entrada de file_map como (prefijo, bloque, sufijo); el bloque se escribe sin espacios en los extremos
+def render_file_parts(item, config, output_dir):
+    content = item['content']
+    if item['type'] == 'html' and item['path'] == 'index.html':
+        prefix = ("<!DOCTYPE html>\n<html>\n<head>\n"
+                  f"<title>{config.get('project_name', 'Aio Project')}</title>\n"
+                  f"<link rel='stylesheet' href='{os.path.basename(os.path.join(output_dir, 'style.css'))}'>\n"
+                  "</head>\n<body>\n")
+        suffix = f"\n<script src='{os.path.basename(os.path.join(output_dir, 'script.js'))}'></script>\n</body>\n</html>"
+        return prefix, content, suffix
+    return '', content, ''
+
+# Archivos web (frontend): <video>, <cs> y <tp> en la raíz de salida
+def plan_web_files(blocks, base_name):
+    file_map = []
+
+    # Web files (Frontend) - siempre en el directorio raíz de salida para una web
+    if blocks['html']:
+        file_map.append({'content': blocks['html'][0], 'path': 'index.html', 'type': 'html', 'block': 'html'})
+    if blocks['css']:
+        file_map.append({'content': blocks['css'][0], 'path': 'style.css', 'type': 'css', 'block': 'css'})
+    if blocks['js']:
+        file_map.append({'content': blocks['js'][0], 'path': 'script.js', 'type': 'js', 'block': 'js'})
+    return file_map
+
+# Archivos DSL: (esp), <ING> y (pat)
+def plan_dsl_files(blocks, base_name):
+    file_map = []
+
+    # DSL files
+    if blocks['esp']:
+        file_map.append({'content': blocks['esp'][0], 'path': f'logic_{base_name}.esp', 'type': 'dsl', 'block': 'esp'})
+    if blocks['ing']:
+        file_map.append({'content': blocks['ing'][0], 'path': f'logic_{base_name}.ing', 'type': 'dsl', 'block': 'ing'})
+    if blocks['pat']:
+        file_map.append({'content': blocks['pat'][0], 'path': f'patterns_{base_name}.pat', 'type': 'dsl', 'block': 'pat'})
+    return file_map
+
+# Archivo de solución de .NET (<sln>)
+def plan_sln_file(blocks, base_name):
+    file_map = []
+
+    # .NET Solution File (.sln)
+    if blocks['sln']:
+        # Asumiendo que el nombre de la solución es el base_name del archivo .aio
+        file_map.append({'content': blocks['sln'][0], 'path': f'{base_name}.sln', 'type': 'sln', 'block': 'sln'})
+    return file_map
+
+# Proyectos .NET (<csproj>), uno por cada <Project ...>.
+# Cada proyecto se parsea una sola vez (y no se vuelve a parsear si su contenido está en la caché);
+# si hay <sln>, se comprueba que la solución y los proyectos generados coinciden.
+def plan_csproj_files(blocks, base_name):
+    file_map = []
+    if not blocks['csproj']:
+        return file_map
+
+    generated = {}
+    for i, (digest, project_xml_content, csproj_info) in enumerate(iter_csproj_projects(blocks['csproj'])):
+        if csproj_info.error:
+            print(f"Advertencia: Error al parsear CSPROJ XML para el proyecto {i}: {csproj_info.error}. Usando nombre genérico.")
+        project_name = csproj_project_name(csproj_info, i)
+
+        csproj_path = os.path.join(project_name, f"{project_name}.csproj")
+        file_map.append({'content': project_xml_content, 'path': csproj_path, 'type': 'csproj', 'block': 'csproj',
+                         'csproj': digest})
+        generated[csproj_path] = csproj_info
+        info(f"CSPROJ: '{csproj_path}' identificado y preparado para guardar.")
+
+    solution_projects = sln_projects(blocks['sln']) if blocks['sln'] else None
+    for warning in check_csproj_against_sln(generated, solution_projects):
+        print(warning)
+    return file_map
+
+# Archivo XAML (<xaml>)
+def plan_xaml_file(blocks, base_name):
+    file_map = []
+
+    # Manejar archivos XAML (<xaml>) - Guardar como un archivo fijo, ya que no tiene comentarios File: en tu .aio
+    if blocks['xaml']:
+        file_map.append({'content': blocks['xaml'][0], 'path': os.path.join("DesktopApp", "MainWindow.xaml"), 'type': 'xaml', 'block': 'xaml'})
+        info(f"XAML: 'DesktopApp/MainWindow.xaml' identificado y preparado para guardar.")
+    return file_map
+
+# Archivo de configuración (<config>)
+def plan_config_file(blocks, base_name):
+    file_map = []
+
+    # Manejar archivos de configuración (<config>) - Guardar como un archivo fijo
+    if blocks['config']:
+        file_map.append({'content': blocks['config'][0], 'path': os.path.join("DesktopApp", "App.config"), 'type': 'config', 'block': 'config'})
+        info(f"CONFIG: 'DesktopApp/App.config' identificado y preparado para guardar.")
+    return file_map
+
+# Lenguajes cuyos bloques se dividen en varios archivos con comentarios 'File: <Proyecto>/<ruta>.<ext>'.
+# Un lenguaje nuevo necesita dos pasos: su etiqueta (key, '<key>', '</key>') en AIO_BLOCK_TAGS de
+# lexer.py, sin la cual el lexer no produce bloques con esa clave, y una entrada aquí. Su marcador
+# entra solo en la expresión de las líneas 'File:' y su generador en FILE_MAP_GENERATORS.
+#   key          -> clave del bloque en `blocks` (y etiqueta <key>)
+#   marker       -> comentario de línea que precede a 'File:'
+#   extension    -> extensión que deben tener las rutas de las secciones (también es el 'type' de la entrada)
+#   default_path -> ruta ('/' como separador) para un bloque sin secciones 'File:'; None para ignorarlo
+#   label        -> nombre del lenguaje en los mensajes
+SplitLanguage = namedtuple('SplitLanguage', ['key', 'marker', 'extension', 'default_path', 'label'])
+
+AIO_SPLIT_LANGUAGES = [
+    SplitLanguage('net', '//', 'cs', None, 'C#'),
+    SplitLanguage('rs', '//', 'rs', 'BusinessLogic/RustCalculations/src/lib.rs', 'Rust'),
+    SplitLanguage('go', '//', 'go', 'ApiProject/GoLogger/main.go', 'Go'),
+    SplitLanguage('sql', '--', 'sql', 'SqlDatabase/Migrations/001_InitialSchema.sql', 'SQL'),
+    SplitLanguage('lua', '--', 'lua', 'ApiProject/config.lua', 'Lua'),
+]
+
+# Una sola expresión para las líneas 'File:' de todos los lenguajes (marcador, proyecto, ruta, extensión);
+# cada lenguaje se queda con las de su marcador y extensión. Los marcadores salen del registro (los
+# más largos primero) y hay versión str y bytes (modo streaming).
+_FILE_MARKERS = sorted({language.marker for language in AIO_SPLIT_LANGUAGES}, key=lambda marker: (-len(marker), marker))
+_FILE_MARKER_PATTERN = (r'[ \t]*(' + '|'.join(re.escape(marker) for marker in _FILE_MARKERS) +
+                        r')[ \t]*File:[ \t]*([^/\\\r\n]+)/([^\r\n]+\.(\w+))[ \t\r]*$')
+_FILE_MARKER_RE = re.compile(_FILE_MARKER_PATTERN, re.MULTILINE)
+_FILE_MARKER_RE_BYTES = re.compile(_FILE_MARKER_PATTERN.encode('utf-8'), re.MULTILINE)
+
+# Secciones 'File:' de un bloque como (ruta relativa, MappedBlock) en una sola pasada.
+# Las secciones son rangos de offsets sobre el bloque (o sobre el archivo mapeado): no se copia texto.
+def split_block_sections(block, language):
+    if isinstance(block, MappedBlock):
+        source, start, end = block.source, block.start, block.end
+    else:
+        source, start, end = block, 0, len(block)
+    if isinstance(source, str):
+        marker_re, newlines = _FILE_MARKER_RE, '\n\r'
+    else:
+        marker_re, newlines = _FILE_MARKER_RE_BYTES, b'\n\r'
+
+    section_path = None
+    section_start = start
+    for match in marker_re.finditer(source, start, end):
+        # Solo cuentan los comentarios al principio de una línea
+        if match.start() > start and source[match.start() - 1] not in newlines:
+            continue
+        marker, project_folder, relative_path, extension = match.groups()
+        if not isinstance(marker, str):
+            marker, project_folder, relative_path, extension = (group.decode('utf-8') for group in match.groups())
+        if marker != language.marker or extension != language.extension:
+            continue
+        if section_path is not None:
+            yield section_path, MappedBlock(source, section_start, match.start())
+        section_path = os.path.join(project_folder.strip(), relative_path.strip())
+        section_start = match.end()
+    if section_path is not None:
+        yield section_path, MappedBlock(source, section_start, end)
+
+# Secciones 'File:' del bloque número `index` del lenguaje. Si `blocks` trae split_sections
+# (ver ParsedBlocks) se reutilizan las ya calculadas y, si no están, se guardan ahí para la caché de parseo.
+def _block_sections(block, language, split_sections, index):
+    if split_sections is None:
+        return list(split_block_sections(block, language))
+    if isinstance(block, MappedBlock):
+        source, base = block.source, block.start
+    else:
+        source, base = block, 0
+    cached = split_sections.get((language.key, index))
+    if cached is not None:
+        count('split_cache_hits')
+        return [(path, MappedBlock(source, base + start, base + end)) for path, start, end in cached]
+    sections = list(split_block_sections(block, language))
+    split_sections[(language.key, index)] = [(path, content.start - base, content.end - base) for path, content in sections]
+    return sections
+
+# Archivos de un lenguaje de AIO_SPLIT_LANGUAGES: una entrada por sección 'File:' de cada bloque.
+# Un bloque sin secciones va a la ruta por defecto del lenguaje (solo el primero: los demás la pisarían).
+def plan_split_files(blocks, language):
+    file_map = []
+    default_used = False
+    split_sections = getattr(blocks, 'split_sections', None)
+    for index, block in enumerate(blocks.get(language.key, [])):
+        sections = 0
+        for path, content in _block_sections(block, language, split_sections, index):
+            sections += 1
+            file_map.append({'content': content, 'path': path, 'type': language.extension, 'block': language.key})
+            info(f"{language.label}: '{path}' identificado y preparado para guardar.")
+        count('split_sections', sections)
+        if sections or language.default_path is None:
+            continue
+        if default_used:
+            print(f"Advertencia: Otro bloque <{language.key}> sin comentarios 'File:'; "
+                  f"'{language.default_path}' ya se generó a partir del primero. Bloque ignorado.")
+            continue
+        default_used = True
+        file_map.append({'content': block, 'path': language.default_path.replace('/', os.sep),
+                         'type': language.extension, 'block': language.key})
+        info(f"{language.label} (default): '{language.default_path}' identificado y preparado para guardar.")
+    return file_map
+
+# Generador de file_map (plan_<key>_files) para un lenguaje de AIO_SPLIT_LANGUAGES
+def _split_generator(language):
+    def generator(blocks, base_name):
+        return plan_split_files(blocks, language)
+    generator.__name__ = generator.__qualname__ = f'plan_{language.key}_files'
+    return generator
+
+# Generadores de file_map por bloque, en el orden en que se guardan los archivos.
+# Cada entrada indica qué claves de `blocks` lee el generador: el modo watch solo
+# vuelve a ejecutar los generadores cuyos bloques cambiaron.
+FILE_MAP_GENERATORS = [
+    (('html', 'css', 'js'), plan_web_files),
+    (('esp', 'ing', 'pat'), plan_dsl_files),
+    (('sln',), plan_sln_file),
+    (('csproj', 'sln'), plan_csproj_files),
+    (('xaml',), plan_xaml_file),
+    (('config',), plan_config_file),
+] + [((language.key,), _split_generator(language)) for language in AIO_SPLIT_LANGUAGES]
+
+# Plan de salidas agrupado por generador. Con previous_plan y changed_keys se reutilizan
+# las entradas de los generadores cuyos bloques no cambiaron.
+def plan_file_map(blocks, base_name, changed_keys=None, previous_plan=None):
+    plan = {}
+    with phase('plan'):
+        for keys, generator in FILE_MAP_GENERATORS:
+            if previous_plan is not None and generator in previous_plan and not set(keys) & set(changed_keys or ()):
+                plan[generator] = previous_plan[generator]
+            else:
+                with phase(f"plan.{generator.__name__[len('plan_'):]}"):
+                    plan[generator] = generator(blocks, base_name)
+                count('planned_files', len(plan[generator]))
+    return plan
+
+# Lista plana de entradas de file_map a partir de un plan
+def flatten_plan(plan):
+    return [item for items in plan.values() for item in items]
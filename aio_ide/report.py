@@ -0,0 +1,80 @@
+# Instrumentación de una ejecución: tiempos por fase, contadores (bytes, archivos, llamadas
+# al sistema) y modo silencioso. Sin informe activo, phase() y count() no hacen nada.
+import time
+import threading
+import contextlib
+
+# Informe de un archivo .aio: fases (segundos y llamadas) y contadores
+class RunReport:
+    def __init__(self, source=None):
+        self.source = source
+        self.phases = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                entry = self.phases.setdefault(name, {'seconds': 0.0, 'calls': 0})
+                entry['seconds'] += elapsed
+                entry['calls'] += 1
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def to_dict(self):
+        return {'source': self.source, 'phases': dict(self.phases), 'counters': dict(self.counters)}
+
+_active_report = None
+_quiet = False
+
+# Activa un informe nuevo para `source`; las fases y contadores se registran en él hasta finish_report()
+def start_report(source=None):
+    global _active_report
+    _active_report = RunReport(source)
+    return _active_report
+
+def finish_report():
+    global _active_report
+    report, _active_report = _active_report, None
+    return report
+
+# Mide una fase del informe activo (uso: `with phase('parse.lex'): ...`)
+def phase(name):
+    if _active_report is None:
+        return contextlib.nullcontext()
+    return _active_report.phase(name)
+
+def count(name, amount=1):
+    if _active_report is not None:
+        _active_report.count(name, amount)
+
+# Modo silencioso: info() no imprime los mensajes por archivo; advertencias y errores usan print()
+def set_quiet(quiet=True):
+    global _quiet
+    _quiet = quiet
+
+def is_quiet():
+    return _quiet
+
+def info(message):
+    if not _quiet:
+        print(message)
+
+# Suma las fases y contadores de varios informes (dicts de RunReport.to_dict())
+def merge_reports(reports):
+    merged = {'phases': {}, 'counters': {}}
+    for report in reports:
+        for name, entry in report['phases'].items():
+            total = merged['phases'].setdefault(name, {'seconds': 0.0, 'calls': 0})
+            total['seconds'] += entry['seconds']
+            total['calls'] += entry['calls']
+        for name, value in report['counters'].items():
+            merged['counters'][name] = merged['counters'].get(name, 0) + value
+    return merged
@@ -0,0 +1,243 @@
+# Procesamiento de uno o varios archivos .aio, en serie o en un pool de procesos
+import io
+import os
+import sys
+import json
+import contextlib
+
+from .lexer import iter_aio_blocks, map_aio_file
+from .parser import parse_meta_block, parse_aio_file
+from .emitter import save_blocks_to_files
+from .discovery import discover_aio_files
+from .includes import include_paths
+from .report import start_report, finish_report, phase, set_quiet, is_quiet
+
+# Archivos .aio a procesar: los archivos indicados tal cual y los .aio de cada directorio (sin repetir).
+# Con recursive=True los directorios se recorren enteros (ver discovery.py); cache_dir guarda su índice
+# e indexes lo conserva en memoria entre llamadas. Los .aio encontrados en directorios que otro de
+# ellos incluye con include= son fragmentos y no se procesan por separado (ver _included_fragments);
+# fragments, si se pasa, recibe la lista de los descartados.
+def find_aio_files(paths, recursive=False, cache_dir=None, indexes=None, fragments=None):
+    aio_files = []
+    discovered = []
+    for path in paths:
+        if os.path.isdir(path) and recursive:
+            found = discover_aio_files(path, cache_dir, indexes=indexes)
+        elif os.path.isdir(path):
+            found = sorted(os.path.normpath(os.path.join(path, f)) for f in os.listdir(path) if f.endswith('.aio'))
+        else:
+            aio_files.append(path)
+            continue
+        aio_files.extend(found)
+        discovered.extend(found)
+
+    included = _included_fragments(discovered, cache_dir)
+    if fragments is not None:
+        fragments.extend(sorted(included))
+    return [aio_file for aio_file in dict.fromkeys(aio_files) if aio_file not in included]
+
+# Config <meta> ya conocida de cada .aio, por ruta absoluta: (mtime_ns, tamaño, config). El modo watch
+# descubre los .aio en cada sondeo y así solo vuelve a leer el <meta> de los que cambiaron.
+_PEEKED_META = {}
+
+# Config <meta> de un .aio sin lexearlo si se puede: la memoria de esta ejecución o la entrada de la
+# caché de parseo de cache_dir que siga valiendo por (tamaño, mtime). None si no está en ninguna.
+def _known_meta(path, file_stat, cache_dir=None):
+    signature = (file_stat.st_mtime_ns, file_stat.st_size)
+    memo = _PEEKED_META.get(path)
+    if memo is not None and memo[:2] == signature:
+        return memo[2]
+    if not cache_dir:
+        return None
+    from .parse_cache import ParseCache
+    config = ParseCache(cache_dir).cached_config(path, file_stat)
+    if config is not None:
+        _PEEKED_META[path] = signature + (config,)
+    return config
+
+# Config <meta> de un .aio leyendo solo hasta su bloque <meta> ({} si no tiene; None si no se puede leer)
+def _peek_meta(aio_file, cache_dir=None):
+    path = os.path.abspath(aio_file)
+    try:
+        file_stat = os.stat(path)
+        config = _known_meta(path, file_stat, cache_dir)
+        if config is not None:
+            return config
+        content = map_aio_file(path)
+    except OSError:
+        return None
+    meta_block = next((block for block in iter_aio_blocks(content) if block.key == 'meta_block'), None)
+    config = parse_meta_block(content, [meta_block]) if meta_block else {}
+    _PEEKED_META[path] = (file_stat.st_mtime_ns, file_stat.st_size, config)
+    return config
+
+# Rutas que incluye un .aio. Si su <meta> no se conoce aún, un archivo que no contiene 'include'
+# en ninguna parte no se lexea: basta una búsqueda de bytes sobre el archivo mapeado.
+def _direct_includes(path, cache_dir=None):
+    try:
+        file_stat = os.stat(path)
+        config = _known_meta(path, file_stat, cache_dir)
+        if config is None:
+            if map_aio_file(path).find(b'include') < 0:
+                return []
+            config = _peek_meta(path, cache_dir)
+    except OSError:
+        return []
+    return include_paths(config, path) if config else []
+
+# .aio de `aio_files` a los que llega otro de ellos por include= (directa o indirectamente). Dos archivos
+# que se incluyen mutuamente no se descartan: así se sigue informando de la inclusión circular.
+def _included_fragments(aio_files, cache_dir=None):
+    includes = {}
+
+    def direct_includes(path):
+        if path not in includes:
+            includes[path] = _direct_includes(path, cache_dir)
+        return includes[path]
+
+    def reachable(path):
+        seen = set()
+        pending = list(direct_includes(path))
+        while pending:
+            include = pending.pop()
+            if include not in seen:
+                seen.add(include)
+                pending.extend(direct_includes(include))
+        return seen
+
+    by_path = {os.path.abspath(aio_file): aio_file for aio_file in aio_files}
+    reached = {path: reachable(path) for path in by_path}
+    fragments = set()
+    for path, targets in reached.items():
+        for target in targets:
+            if target in by_path and target != path and path not in reached[target]:
+                fragments.add(by_path[target])
+    return fragments
+
+def _parse_and_save(aio_file, base_name, stream, output_dir, save_options, cache=None):
+    with phase('parse'):
+        aio_code_blocks, config = parse_aio_file(aio_file, stream=stream, cache=cache)
+
+    if aio_code_blocks is None:
+        print(f"Saltando {aio_file} debido a errores de parseo.")
+        return None
+    if output_dir:
+        config['output_dir'] = output_dir
+
+    try:
+        with phase('save'):
+            return save_blocks_to_files(aio_code_blocks, config, base_name, **save_options)
+    finally:
+        if cache is not None:
+            # Después del plan: la entrada incluye las secciones 'File:' ya encontradas
+            with phase('parse.cache_save'):
+                cache.flush()
+
+# Procesa un archivo .aio completo (parseo + generación); devuelve los contadores o None si falló el parseo.
+# Los contadores incluyen 'report' con los tiempos por fase y contadores de la ejecución.
+# output_dir sustituye al output_dir del <meta>. Con report_dir se guarda el informe JSON del archivo
+# (<base_name>.report.json) y, con profile=True, también un volcado de cProfile (<base_name>.prof).
+# Con cache_dir se usa la caché de parseo persistente de ese directorio (ver parse_cache.py), limitada
+# a cache_max_bytes (salvo con dry_run, que no la crea ni la escribe). save_options se pasa tal cual a save_blocks_to_files
+# (force, emit_workers, fsync, dry_run, backend, link_identical).
+def process_aio_file(aio_file, stream=False, output_dir=None, report_dir=None, profile=False, cache_dir=None,
+                     cache_max_bytes=None, **save_options):
+    base_name = os.path.splitext(os.path.basename(aio_file))[0]
+    cache = None
+    if cache_dir and not save_options.get('dry_run'):
+        from .parse_cache import ParseCache, DEFAULT_CACHE_MAX_BYTES
+        cache = ParseCache(cache_dir, cache_max_bytes or DEFAULT_CACHE_MAX_BYTES)
+    report = start_report(aio_file)
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        stats = _parse_and_save(aio_file, base_name, stream, output_dir, save_options, cache)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        finish_report()
+
+    report_data = report.to_dict()
+    if stats is not None:
+        stats['report'] = report_data
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+        report_path = os.path.join(report_dir, f'{base_name}.report.json')
+        with open(report_path, 'w', encoding='utf-8') as f:
+            stats_only = {key: value for key, value in (stats or {}).items() if key != 'report'}
+            json.dump(dict(report_data, base_name=base_name, stats=stats_only if stats else None), f, indent=2)
+        if profiler is not None:
+            profiler.dump_stats(os.path.join(report_dir, f'{base_name}.prof'))
+    return stats
+
+# Lee solo hasta el bloque <meta> (o lo toma de la caché de parseo) para saber en qué output_dir escribirá un .aio
+def peek_output_dir(aio_file, output_dir=None, cache_dir=None):
+    if output_dir:
+        return os.path.normcase(os.path.abspath(output_dir))
+    config = _peek_meta(aio_file, cache_dir)
+    if config is None:
+        return None
+    return os.path.normcase(os.path.abspath(config.get('output_dir', 'build')))
+
+# Agrupa los .aio por output_dir: los que comparten directorio se procesan en serie dentro del mismo grupo
+def group_by_output_dir(aio_files, output_dir=None, cache_dir=None):
+    groups = {}
+    for aio_file in aio_files:
+        target_dir = peek_output_dir(aio_file, output_dir, cache_dir)
+        groups.setdefault(target_dir or aio_file, []).append(aio_file)
+    for target_dir, group in groups.items():
+        if len(group) > 1:
+            print(f"Advertencia: {', '.join(group)} escriben en el mismo directorio '{target_dir}'. Se procesarán en serie.")
+    return list(groups.values())
+
+# process_aio_file que no aborta la ejecución: un error en un .aio se informa y cuenta como fallo (None).
+# Lo usan tanto el modo en serie como los procesos del pool, para que -j 1 y -j N se comporten igual.
+def _process_aio_file_safely(aio_file, options):
+    try:
+        return process_aio_file(aio_file, **options)
+    except Exception as e:
+        print(f"Error al procesar '{aio_file}': {e}")
+        return None
+
+# Tarea de un proceso del pool: procesa un grupo en orden y captura la salida de cada archivo.
+# options son los argumentos de process_aio_file; quiet se aplica también en el proceso hijo.
+def process_aio_group(aio_files, options=None, quiet=False):
+    set_quiet(quiet)
+    results = []
+    for aio_file in aio_files:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            stats = _process_aio_file_safely(aio_file, options or {})
+        results.append((aio_file, output.getvalue(), stats))
+    return results
+
+# Procesa los .aio en un pool de procesos; imprime la salida de cada archivo completa y en orden
+def process_aio_files_parallel(aio_files, jobs, options=None):
+    import concurrent.futures
+
+    options = options or {}
+    groups = group_by_output_dir(aio_files, options.get('output_dir'), options.get('cache_dir'))
+    group_of_file = {aio_file: index for index, group in enumerate(groups) for aio_file in group}
+    results = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(process_aio_group, group, options, is_quiet()) for group in groups]
+        for aio_file in aio_files:
+            if aio_file not in results:
+                for result in futures[group_of_file[aio_file]].result():
+                    results[result[0]] = result
+            _, output, stats = results[aio_file]
+            sys.stdout.write(output)
+            sys.stdout.flush()
+            yield aio_file, stats
+
+# Procesa varios .aio (en paralelo si jobs > 1) y produce (archivo, contadores o None) en orden.
+# options son los argumentos de process_aio_file (stream, output_dir, report_dir, profile, cache_dir, force...).
+def process_aio_files(aio_files, jobs=1, **options):
+    if jobs > 1 and len(aio_files) > 1:
+        yield from process_aio_files_parallel(aio_files, jobs, options)
+    else:
+        for aio_file in aio_files:
+            yield aio_file, _process_aio_file_safely(aio_file, options)
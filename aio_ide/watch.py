@@ -0,0 +1,81 @@
+# Modo watch: regenera solo los bloques que cambian al guardar un .aio
+import os
+import time
+
+from .parser import parse_aio_file
+from .planner import plan_file_map, flatten_plan
+from .emitter import save_blocks_to_files
+from .runner import find_aio_files
+
+# Regenera un .aio reutilizando su estado anterior en memoria (bloques, config y plan):
+# solo se ejecutan los generadores de los bloques que cambiaron. Devuelve el nuevo estado.
+def regenerate_aio_file(aio_file, previous_state=None, output_dir=None, **save_options):
+    base_name = os.path.splitext(os.path.basename(aio_file))[0]
+    blocks, config = parse_aio_file(aio_file)
+    if blocks is None:
+        return {'blocks': None, 'config': None, 'plan': None}
+    if output_dir:
+        config['output_dir'] = output_dir
+
+    if previous_state and previous_state['blocks'] is not None and previous_state['config'] == config:
+        changed_keys = [key for key in blocks if blocks[key] != previous_state['blocks'].get(key)]
+        if not changed_keys:
+            print("Sin cambios en los bloques; no se regenera nada.")
+            return dict(previous_state, blocks=blocks)
+        plan = plan_file_map(blocks, base_name, changed_keys, previous_state['plan'])
+    else:
+        # Primera vez o <meta> distinto (output_dir, project_name...): plan completo
+        changed_keys = [key for key in blocks if blocks[key]]
+        plan = plan_file_map(blocks, base_name)
+
+    print(f"Bloques modificados: {', '.join(changed_keys)}")
+    save_blocks_to_files(blocks, config, base_name, file_map=flatten_plan(plan), **save_options)
+    return {'blocks': blocks, 'config': config, 'plan': plan}
+
+# Firma (mtime, tamaño) de un .aio y de los fragmentos que incluía la última vez que se regeneró
+def _watch_signature(aio_path, file_stat, state):
+    include_graph = getattr((state or {}).get('blocks'), 'include_graph', {})
+    signature = [(file_stat.st_mtime_ns, file_stat.st_size)]
+    for fragment_path in include_graph:
+        if fragment_path == os.path.abspath(aio_path):
+            continue
+        try:
+            fragment_stat = os.stat(fragment_path)
+        except OSError:
+            signature.append(None)
+            continue
+        signature.append((fragment_stat.st_mtime_ns, fragment_stat.st_size))
+    return tuple(signature)
+
+# Modo watch: sondea los .aio de `paths` (mtime y tamaño, también de sus fragmentos incluidos) y regenera solo lo que cambió al guardar.
+# Con recursive=True el índice de descubrimiento se conserva en memoria entre sondeos (y en cache_dir, si se pasa):
+# cada sondeo solo hace un stat por directorio y vuelve a listar los que cambiaron.
+def watch_aio_files(paths=('.',), interval=0.05, output_dir=None, recursive=False, cache_dir=None, **save_options):
+    states = {}
+    discovery_indexes = {}
+    print(f"Modo watch: vigilando archivos .aio en {', '.join(paths)} (Ctrl+C para salir)...")
+    try:
+        while True:
+            found = set()
+            for aio_path in find_aio_files(paths, recursive=recursive, cache_dir=cache_dir, indexes=discovery_indexes):
+                try:
+                    file_stat = os.stat(aio_path)
+                except OSError:
+                    continue
+                found.add(aio_path)
+                state = states.get(aio_path)
+                if state is not None and state['signature'] == _watch_signature(aio_path, file_stat, state):
+                    continue
+
+                started = time.perf_counter()
+                state = regenerate_aio_file(aio_path, state, output_dir=output_dir, **save_options)
+                state['signature'] = _watch_signature(aio_path, file_stat, state)
+                states[aio_path] = state
+                print(f"'{aio_path}' regenerado en {(time.perf_counter() - started) * 1000:.1f} ms.")
+
+            for aio_path in set(states) - found:
+                del states[aio_path]
+                print(f"'{aio_path}' ya no existe; se deja de vigilar.")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nModo watch detenido.")
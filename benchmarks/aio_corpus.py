@@ -0,0 +1,126 @@
+# Generador de archivos .aio sintéticos para los benchmarks.
+#
+#   python benchmarks/aio_corpus.py --size 5000000 --sections 2000 --projects 50 -o big.aio
+import sys
+import random
+import argparse
+
+# Tipos de bloque en el orden en que se van añadiendo al aumentar tag_types (<meta> siempre va)
+CORPUS_TAG_TYPES = ['net', 'rs', 'go', 'sql', 'lua', 'csproj', 'crea', 'video', 'cs', 'tp',
+                    'esp', 'ING', 'pat', 'sln', 'xaml', 'config']
+
+# Bloques separados en archivos por comentarios 'File:': (etiqueta, marcador, carpeta, extensión)
+SPLIT_BLOCKS = [
+    ('net', '//', 'Project{project}/Services', 'cs'),
+    ('rs', '//', 'RustCrate/src', 'rs'),
+    ('go', '//', 'GoService/pkg', 'go'),
+    ('sql', '--', 'Database/Migrations', 'sql'),
+    ('lua', '--', 'Scripts', 'lua'),
+]
+
+# Bloques de un solo archivo y una línea de relleno típica de cada uno
+SINGLE_BLOCKS = {
+    'video': ('<video>', '</video>', '    <p>Contenido generado {n}</p>'),
+    'cs': ('<cs>', '</cs>', '.item-{n} {{ color: #{n:06x}; }}'),
+    'tp': ('<tp>', '</tp>', 'console.log("linea {n}");'),
+    'esp': ('(esp)', '(/esp)', '$creafuntion "f{n}" &intert (x = "{n}"),'),
+    'ING': ('<ING>', '</ING>', '$create_function "f{n}" &insert (x = "{n}"),'),
+    'pat': ('(pat)', '(/pat)', '    log_message "paso {n}",'),
+    'sln': ('<sln>', '</sln>', '# Comentario de solución {n}'),
+    'xaml': ('<xaml>', '</xaml>', '    <TextBlock Text="Linea {n}" />'),
+    'config': ('<config>', '</config>', '    <add key="Key{n}" value="{n}" />'),
+}
+
+
+def _filler(prefix, size, rng):
+    lines = []
+    written = 0
+    n = 0
+    while written < size:
+        line = f"{prefix} valor_{n} = {rng.randint(0, 1 << 30)};"
+        lines.append(line)
+        written += len(line) + 1
+        n += 1
+    return '\n'.join(lines)
+
+# Devuelve el texto de un .aio sintético de aproximadamente `size` bytes
+def generate_aio(size=100_000, tag_types=len(CORPUS_TAG_TYPES), sections=20, projects=4, crea_commands=10,
+                 output_dir='bench_out', seed=0):
+    rng = random.Random(seed)
+    tags = CORPUS_TAG_TYPES[:max(0, tag_types)]
+    split_tags = [entry for entry in SPLIT_BLOCKS if entry[0] in tags]
+    single_tags = [tag for tag in tags if tag in SINGLE_BLOCKS]
+
+    # El relleno se reparte entre las secciones 'File:' y los bloques de un solo archivo
+    fill_units = sections * len(split_tags) + len(single_tags) or 1
+    fill_size = max(0, size // fill_units - 80)
+
+    parts = [f'<meta>\nproject_name = "Bench",\noutput_dir = "{output_dir}"\n</meta>\n']
+
+    if 'crea' in tags:
+        commands = []
+        for i in range(crea_commands):
+            if i % 3 == 0:
+                commands.append(f'$crea=file Name="gen/dir{i}" %Not_extencion,')
+            elif i % 3 == 1:
+                commands.append(f'$crea=file Name="gen/assets/file{i}" %extencion .txt,')
+            else:
+                commands.append(f'%borra=Name="gen/assets/file{i - 1}.txt" %all,')
+        parts.append('<crea>\n' + '\n'.join(commands) + '\n</crea>\n')
+
+    for tag, marker, folder, extension in split_tags:
+        body = []
+        for i in range(sections):
+            path = f"{folder.format(project=i % max(projects, 1))}/File{i}.{extension}"
+            body.append(f"{marker} File: {path}\n{_filler(marker, fill_size, rng)}")
+        parts.append(f'<{tag}>\n' + '\n'.join(body) + f'\n</{tag}>\n')
+
+    if 'csproj' in tags:
+        project_xml = []
+        for i in range(projects):
+            project_xml.append(
+                '<Project Sdk="Microsoft.NET.Sdk">\n  <PropertyGroup>\n    <TargetFramework>net8.0</TargetFramework>\n'
+                f'    <RootNamespace>Project{i}</RootNamespace>\n  </PropertyGroup>\n</Project>')
+        parts.append('<csproj>\n' + '\n\n'.join(project_xml) + '\n</csproj>\n')
+
+    for tag in single_tags:
+        open_tag, close_tag, line = SINGLE_BLOCKS[tag]
+        lines = []
+        written = 0
+        n = 0
+        while written < fill_size:
+            text = line.format(n=n)
+            lines.append(text)
+            written += len(text) + 1
+            n += 1
+        parts.append(f"{open_tag}\n" + '\n'.join(lines) + f"\n{close_tag}\n")
+
+    return '\n'.join(parts)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Genera un archivo .aio sintético.")
+    arg_parser.add_argument('--size', type=int, default=100_000, help="Tamaño aproximado en bytes.")
+    arg_parser.add_argument('--tag-types', type=int, default=len(CORPUS_TAG_TYPES),
+                            help=f"Número de tipos de bloque además de <meta> (máx. {len(CORPUS_TAG_TYPES)}).")
+    arg_parser.add_argument('--sections', type=int, default=20,
+                            help="Secciones 'File:' en cada bloque <net>/<rs>/<go>/<sql>/<lua>.")
+    arg_parser.add_argument('--projects', type=int, default=4, help="Número de <Project> en <csproj>.")
+    arg_parser.add_argument('--crea-commands', type=int, default=10, help="Número de comandos en <crea>.")
+    arg_parser.add_argument('--output-dir', default='bench_out', help="output_dir escrito en el <meta>.")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('-o', '--output', help="Archivo de salida (por defecto stdout).")
+    args = arg_parser.parse_args(argv)
+
+    text = generate_aio(args.size, args.tag_types, args.sections, args.projects, args.crea_commands,
+                        args.output_dir, args.seed)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# Benchmarks de parse_aio_file, plan_file_map, save_blocks_to_files y parse_crea_block sobre
+# .aio sintéticos (ver aio_corpus.py). Emite un informe JSON con tiempos por fase, throughput
+# y memoria pico, y puede compararse con una línea base guardada.
+#
+#   python benchmarks/bench_aio.py --save-baseline baseline.json
+#   python benchmarks/bench_aio.py --baseline baseline.json --tolerance 0.25
+#   python benchmarks/bench_aio.py --cases custom --size 20000000 --sections 10000
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from aio_corpus import generate_aio
+from aio_ide.parser import parse_aio_file
+from aio_ide.planner import plan_file_map, flatten_plan
+from aio_ide.emitter import save_blocks_to_files
+from aio_ide.crea import parse_crea_block
+from aio_ide.lexer import block_text
+from aio_ide.parse_cache import ParseCache
+
+# Casos predefinidos: parámetros de generate_aio (o un archivo .aio existente)
+BENCH_CASES = {
+    'demo': {'file': os.path.join(REPO_ROOT, 'full_project_demo.aio')},
+    'small': {'size': 100_000, 'sections': 20},
+    'large': {'size': 8_000_000, 'sections': 200},
+    'many_sections': {'size': 2_000_000, 'sections': 5000},
+    'many_projects': {'size': 500_000, 'projects': 500},
+    'many_crea': {'size': 100_000, 'crea_commands': 5000},
+}
+DEFAULT_CASES = ['demo', 'small', 'large', 'many_sections', 'many_projects', 'many_crea']
+
+# Diferencia mínima (s) para considerar una regresión, por debajo de esto es ruido
+MIN_REGRESSION_SECONDS = 0.005
+
+
+# Ejecuta fn() sin salida por consola; devuelve (resultado, segundos)
+def _timed(fn):
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        result = fn()
+        return result, time.perf_counter() - started
+
+# Mejor tiempo de `repeat` ejecuciones; setup() prepara cada ejecución y devuelve el callable
+def _best_time(setup, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        result, seconds = _timed(setup())
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+# Memoria pico (bytes) de una ejecución bajo tracemalloc
+def _peak_memory(setup):
+    fn = setup()
+    tracemalloc.start()
+    try:
+        _timed(fn)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(name, params, work_dir, repeat):
+    if 'file' in params:
+        aio_path = params['file']
+    else:
+        aio_path = os.path.join(work_dir, f'{name}.aio')
+        with open(aio_path, 'w', encoding='utf-8') as f:
+            f.write(generate_aio(**params))
+    input_bytes = os.path.getsize(aio_path)
+    base_name = os.path.splitext(os.path.basename(aio_path))[0]
+    output_dir = os.path.join(work_dir, f'{name}_out')
+
+    def fresh_output():
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    (blocks, config), _ = _timed(lambda: parse_aio_file(aio_path))
+    config = dict(config, output_dir=output_dir)
+    crea_texts = [block_text(block) for block in blocks['crea_block']]
+
+    def save_setup():
+        fresh_output()
+        return lambda: save_blocks_to_files(blocks, config, base_name, force=True)
+
+    # Parseo con la caché persistente ya caliente (archivo sin cambios)
+    def parse_cached_setup():
+        cache = ParseCache(os.path.join(work_dir, f'{name}_cache'))
+        cached_blocks, _ = parse_aio_file(aio_path, cache=cache)
+        plan_file_map(cached_blocks, base_name)
+        cache.flush()
+        return lambda: (parse_aio_file(aio_path, cache=cache), cache.flush())
+
+    def crea_setup():
+        fresh_output()
+        os.makedirs(output_dir)
+        return lambda: [parse_crea_block(text, output_dir) for text in crea_texts]
+
+    phases = {
+        'parse': lambda: (lambda: parse_aio_file(aio_path)),
+        'parse_stream': lambda: (lambda: parse_aio_file(aio_path, stream=True)),
+        'parse_cached': parse_cached_setup,
+        'plan': lambda: (lambda: flatten_plan(plan_file_map(blocks, base_name))),
+        'save': save_setup,
+        'save_incremental': lambda: (lambda: save_blocks_to_files(blocks, config, base_name)),
+        'crea': crea_setup,
+    }
+
+    report = {'name': name, 'params': params, 'input_bytes': input_bytes, 'phases': {}}
+    results = {}
+    for phase, setup in phases.items():
+        if phase == 'save_incremental':
+            _timed(save_setup())  # deja la salida y el manifiesto listos
+        results[phase], seconds = _best_time(setup, repeat)
+        if phase == 'save_incremental':
+            _timed(save_setup())
+        report['phases'][phase] = {'seconds': seconds, 'peak_bytes': _peak_memory(setup)}
+    fresh_output()
+
+    files_written = results['save']['written']
+    mb = input_bytes / 1_000_000
+    report['files_written'] = files_written
+    report['throughput'] = {
+        'parse_mb_s': mb / report['phases']['parse']['seconds'],
+        'parse_stream_mb_s': mb / report['phases']['parse_stream']['seconds'],
+        'parse_cached_mb_s': mb / report['phases']['parse_cached']['seconds'],
+        'save_files_s': files_written / report['phases']['save']['seconds'],
+        'save_mb_s': mb / report['phases']['save']['seconds'],
+    }
+    return report
+
+# Compara con una línea base; devuelve la lista de regresiones (caso, fase, antes, ahora)
+def compare_with_baseline(report, baseline, tolerance):
+    baseline_cases = {case['name']: case for case in baseline.get('cases', [])}
+    regressions = []
+    for case in report['cases']:
+        previous = baseline_cases.get(case['name'])
+        if previous is None or previous.get('params') != case['params']:
+            continue
+        for phase, timing in case['phases'].items():
+            before = previous['phases'].get(phase, {}).get('seconds')
+            if before is None:
+                continue
+            now = timing['seconds']
+            if now > before * (1 + tolerance) and now - before > MIN_REGRESSION_SECONDS:
+                regressions.append((case['name'], phase, before, now))
+    return regressions
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmarks de aio_ide sobre .aio sintéticos.")
+    arg_parser.add_argument('--cases', default=','.join(DEFAULT_CASES),
+                            help=f"Casos separados por comas ({', '.join(BENCH_CASES)}, custom).")
+    arg_parser.add_argument('--size', type=int, default=1_000_000, help="Caso custom: tamaño aproximado en bytes.")
+    arg_parser.add_argument('--tag-types', type=int, default=16, help="Caso custom: tipos de bloque.")
+    arg_parser.add_argument('--sections', type=int, default=100, help="Caso custom: secciones 'File:' por bloque.")
+    arg_parser.add_argument('--projects', type=int, default=4, help="Caso custom: proyectos <csproj>.")
+    arg_parser.add_argument('--crea-commands', type=int, default=10, help="Caso custom: comandos <crea>.")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Repeticiones por fase; se usa la mejor.")
+    arg_parser.add_argument('-o', '--output', help="Guarda el informe JSON en este archivo (además de stdout).")
+    arg_parser.add_argument('--save-baseline', help="Guarda el informe como línea base.")
+    arg_parser.add_argument('--baseline', help="Línea base con la que comparar.")
+    arg_parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Empeoramiento relativo permitido frente a la línea base (por defecto 0.25).")
+    args = arg_parser.parse_args(argv)
+
+    cases = dict(BENCH_CASES)
+    cases['custom'] = {'size': args.size, 'tag_types': args.tag_types, 'sections': args.sections,
+                       'projects': args.projects, 'crea_commands': args.crea_commands}
+
+    report = {'python': platform.python_version(), 'platform': platform.platform(), 'cases': []}
+    with tempfile.TemporaryDirectory(prefix='aio_bench_') as work_dir:
+        for name in args.cases.split(','):
+            name = name.strip()
+            if name not in cases:
+                arg_parser.error(f"caso desconocido: {name}")
+            print(f"Ejecutando caso '{name}'...", file=sys.stderr)
+            report['cases'].append(run_case(name, cases[name], work_dir, args.repeat))
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.tolerance)
+        for case_name, phase, before, now in regressions:
+            print(f"Regresión en {case_name}/{phase}: {before * 1000:.1f} ms -> {now * 1000:.1f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+        print("Sin regresiones frente a la línea base.", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
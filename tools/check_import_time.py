@@ -0,0 +1,56 @@
+# Control de regresión del tiempo de arranque: mide `import aio_ide` y `import aio_ide.cli`
+# con `python -X importtime` y falla si superan el presupuesto o cargan módulos pesados.
+#
+#   python tools/check_import_time.py [--budget-ms 15] [--runs 5]
+import os
+import sys
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que solo deben importarse cuando se usan (csproj, pools, CLI, caché de parseo)
+DEFERRED_MODULES = ('xml.etree.ElementTree', 'concurrent.futures', 'argparse', 'json', 'hashlib')
+
+# Tiempo acumulado (µs) del módulo `module_name` según la salida de -X importtime
+def measure_import_us(module_name):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module_name and not parts[2].startswith('  '):
+            return int(parts[1].strip())
+    raise RuntimeError(f"No se encontró '{module_name}' en la salida de -X importtime")
+
+# Módulos de DEFERRED_MODULES que quedan cargados tras importar `module_name`
+def loaded_deferred_modules(module_name):
+    code = (f"import sys, {module_name}; "
+            f"print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Comprueba el presupuesto de tiempo de importación de aio_ide.")
+    arg_parser.add_argument('--budget-ms', type=float, default=15.0,
+                            help="Tiempo máximo de importación por módulo, en ms (por defecto 15).")
+    arg_parser.add_argument('--runs', type=int, default=5,
+                            help="Repeticiones por módulo; se usa la mejor (por defecto 5).")
+    args = arg_parser.parse_args(argv)
+
+    failed = False
+    for module_name in ('aio_ide', 'aio_ide.cli'):
+        best_us = min(measure_import_us(module_name) for _ in range(args.runs))
+        status = "OK" if best_us <= args.budget_ms * 1000 else "EXCEDIDO"
+        print(f"{module_name}: {best_us / 1000:.2f} ms (presupuesto {args.budget_ms:.2f} ms) {status}")
+        failed |= status != "OK"
+
+        loaded = loaded_deferred_modules(module_name)
+        if loaded:
+            print(f"{module_name}: importa módulos que deberían ser diferidos: {', '.join(loaded)}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())